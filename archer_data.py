@@ -0,0 +1,181 @@
+import os
+import re
+from functools import lru_cache
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from extract_cache import cached_frame
+from pivot_engine import CUBE_DIMS, VALUE_COL, aggregate_cells, build_cube, split_cube
+from run_profile import frame_shape, record, stage
+
+
+ARCHER_FILE = "8 July 2025 Archer Toxic sharing.xlsx"
+ARCHER_SHEET = "Archer Search Report (2)"
+
+# Bump when the parsed frame changes shape/types so old cache entries are ignored
+ARCHER_CACHE_VARIANT = "v2"
+ARCHER_CELLS_CACHE_VARIANT = "cells-v1"
+
+# Rows held at once by the chunked loader before they are folded into the cells
+CHUNK_ROWS = 50_000
+
+FLT_STATUS = "Forward Looking Toxic"
+TOXIC_STATUS = "Toxic"
+GROUP_TYPE = "Group"
+LOCAL_TYPE = "Regional/Local"
+
+ALL_OE_LIST = [
+    "Allianz China - Holding", "Allianz China - P&C", "Allianz Indonesia",
+    "Allianz Malaysia", "Allianz Philippine - L&H", "Allianz Singapore",
+    "Allianz Sri Lanka", "Allianz Taiwan - Life", "Allianz Thailand"
+]
+
+# Only these columns feed the reports; the rest of the extract is never read
+REPORT_COLUMNS = CUBE_DIMS + [VALUE_COL]
+# A few distinct values repeated on every row: stored as integer codes plus one dictionary each
+CATEGORY_COLUMNS = [col for col in CUBE_DIMS if col != "Toxic from Date"]
+
+# "8 July 2025 ...", "3rd Feb 2026 ...", "2025-07-08 ..."
+_DAY_MONTH_YEAR = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?[ _-]+([A-Za-z]{3,9})[ _-]+(\d{4})\b")
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+
+
+def snapshot_date(file_path):
+    """The snapshot date in an extract's file name, or None if it has none."""
+    name = os.path.basename(file_path)
+    match = _ISO_DATE.search(name)
+    if match:
+        return pd.Timestamp("-".join(match.groups()))
+    match = _DAY_MONTH_YEAR.search(name)
+    if match:
+        date = pd.to_datetime(" ".join(match.groups()), format="mixed", errors="coerce")
+        return None if pd.isna(date) else date
+    return None
+
+
+def coerce_archer_types(df):
+    """Give the extract stable column types (counts, dates, text)."""
+    df["Number of IT Assets"] = pd.to_numeric(df["Number of IT Assets"], errors="coerce").fillna(0)
+    df["Toxic from Date"] = pd.to_datetime(df["Toxic from Date"], errors="coerce")
+
+    # Excel hands back a mix of str/int/float in free-text columns; keep them text
+    for col in df.columns[df.dtypes == object]:
+        values = df[col]
+        df[col] = values.where(values.isna(), values.astype(str))
+    return df
+
+
+def compact_archer_frame(df):
+    """Keep only REPORT_COLUMNS, with the text dimensions as categoricals."""
+    df = df[REPORT_COLUMNS].copy()
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def parse_archer_extract(file_path=ARCHER_FILE, sheet_name=ARCHER_SHEET):
+    with stage("read_excel"):
+        # Header cells can carry stray spaces, so match the wanted columns stripped
+        df = pd.read_excel(file_path, sheet_name=sheet_name, usecols=lambda name: str(name).strip() in REPORT_COLUMNS)
+        record(**frame_shape(df))
+    df.columns = df.columns.str.strip()
+    return compact_archer_frame(coerce_archer_types(df))
+
+
+@lru_cache(maxsize=None)
+def load_archer_extract(file_path=ARCHER_FILE, sheet_name=ARCHER_SHEET, use_cache=True):
+    """Parse the Archer search report once per process and strip its column names.
+
+    With `use_cache` the parsed frame is also kept on disk (see extract_cache),
+    so later runs against an unchanged file skip the xlsx parse entirely.
+    Every report shares the returned frame, so callers filter/copy it and never
+    modify it in place.
+    """
+    if not use_cache:
+        return parse_archer_extract(file_path, sheet_name)
+    return cached_frame(
+        file_path, sheet_name,
+        lambda: parse_archer_extract(file_path, sheet_name),
+        variant=ARCHER_CACHE_VARIANT,
+    )
+
+
+def _excel_value(value):
+    # What pd.read_excel hands back for the same cell: whole floats become ints
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _fold(cells, chunk):
+    df = coerce_archer_types(pd.DataFrame(chunk, columns=REPORT_COLUMNS))
+    # A chunk can hold only numbers where the sheet as a whole is mixed; keep the keys text
+    for col in CATEGORY_COLUMNS:
+        values = df[col]
+        df[col] = values.where(values.isna(), values.astype(str))
+    if cells is not None:
+        df = pd.concat([cells, aggregate_cells(df)], ignore_index=True)
+    return aggregate_cells(df)
+
+
+def stream_archer_cells(file_path=ARCHER_FILE, sheet_name=ARCHER_SHEET, chunk_rows=CHUNK_ROWS):
+    """Aggregated cube cells of the extract, without ever holding the whole sheet.
+
+    The sheet is read row by row (read-only openpyxl), only REPORT_COLUMNS are
+    kept, and every `chunk_rows` rows are summed into the running cells. Memory
+    follows the number of distinct cells rather than the number of rows.
+    """
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet_name].iter_rows(values_only=True)
+        header = [str(name).strip() if name is not None else None for name in next(rows, ())]
+        missing = [col for col in REPORT_COLUMNS if col not in header]
+        if missing:
+            raise ValueError(f"{sheet_name!r} in {file_path!r} has no column(s) {missing}")
+        positions = [header.index(col) for col in REPORT_COLUMNS]
+
+        cells, chunk, n_rows = None, [], 0
+        for row in rows:
+            values = [_excel_value(row[pos]) if pos < len(row) else None for pos in positions]
+            if all(value is None for value in values):
+                continue
+            chunk.append(values)
+            if len(chunk) >= chunk_rows:
+                cells = _fold(cells, chunk)
+                n_rows += len(chunk)
+                chunk = []
+        n_rows += len(chunk)
+        cells = _fold(cells, chunk)
+    finally:
+        wb.close()
+    record(rows=n_rows, cells=len(cells))
+    return cells
+
+
+def load_archer_cube(file_path=ARCHER_FILE, sheet_name=ARCHER_SHEET, use_cache=True, chunk_rows=None):
+    """Status x type x OE x component cube of the extract (see pivot_engine.build_cube).
+
+    With `chunk_rows` the sheet is streamed and folded into the cells
+    `chunk_rows` rows at a time (see stream_archer_cells), for extracts too
+    large to parse in one go; the cache then keeps the cells, not the rows.
+    """
+    if chunk_rows:
+        with stage("stream_cells", chunk_rows=chunk_rows):
+            build = lambda: stream_archer_cells(file_path, sheet_name, chunk_rows)
+            if use_cache:
+                cells = cached_frame(file_path, sheet_name, build, variant=ARCHER_CELLS_CACHE_VARIANT)
+            else:
+                cells = build()
+        with stage("build_cube"):
+            cube = split_cube(cells)
+            record(cells=len(cells), slices=len(cube))
+        return cube
+
+    with stage("load_extract"):
+        df = load_archer_extract(file_path, sheet_name, use_cache)
+        record(**frame_shape(df))
+    with stage("build_cube"):
+        cube = build_cube(df)
+        record(cells=sum(len(part) for part in cube.values()), slices=len(cube))
+    return cube
@@ -0,0 +1,57 @@
+from functools import lru_cache
+
+import pandas as pd
+
+from extract_cache import cached_frame
+from run_profile import frame_shape, record, stage
+
+
+# The 'IT Architecture' inventory extract; its file name changes per export, so callers pass the path
+ARCH_SHEET = "IT Architecture"
+
+# Bump when the parsed frame changes shape/types so old cache entries are ignored
+ARCH_CACHE_VARIANT = "v1"
+
+ARCH_ID = "ID"
+VALID_FROM = "Valid From"
+LIFECYCLE = "Lifecycle state"
+ARCH_EXTRACT_DATE = "Date extracted"
+ARCH_DATE_COLUMNS = [VALID_FROM, ARCH_EXTRACT_DATE]
+
+
+def normalise_architecture(df):
+    """Stripped headers, date-only Valid From / Date extracted, text IDs and lifecycle states."""
+    df = df.copy()
+    df.columns = [str(col).strip() for col in df.columns]
+    missing = [col for col in (ARCH_ID, VALID_FROM, LIFECYCLE) if col not in df.columns]
+    if missing:
+        raise ValueError(f"IT Architecture extract has no column(s) {missing}")
+    for col in ARCH_DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce").dt.normalize()
+    for col in (ARCH_ID, LIFECYCLE):
+        values = df[col]
+        df[col] = values.where(values.isna(), values.astype(str).str.strip())
+    return df.reset_index(drop=True)
+
+
+def parse_architecture(file_path, sheet_name=ARCH_SHEET):
+    with stage("read_excel"):
+        raw = pd.read_excel(file_path, sheet_name=sheet_name)
+        record(**frame_shape(raw))
+    return normalise_architecture(raw)
+
+
+@lru_cache(maxsize=None)
+def load_architecture(file_path, sheet_name=ARCH_SHEET, use_cache=True):
+    """The normalised 'IT Architecture' rows, parsed once per process (and cached on disk).
+
+    Shared between callers, so filter/copy it and never modify it in place.
+    """
+    if not use_cache:
+        return parse_architecture(file_path, sheet_name)
+    return cached_frame(
+        file_path, sheet_name,
+        lambda: parse_architecture(file_path, sheet_name),
+        variant=ARCH_CACHE_VARIANT,
+    )
@@ -0,0 +1,182 @@
+import argparse
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from architecture_data import ARCH_ID, ARCH_SHEET, LIFECYCLE, VALID_FROM, load_architecture
+from date_buckets import dashboard_months, write_tables
+from decom_data import DECOM_FILE, FORECAST_END, PHASE, load_decom_extract
+from decom_metrics import phase_flags
+from decom_store import read_partitions
+from run_profile import add_profile_argument, parse_profiled_args, record, stage
+
+
+ARCH_METRICS_FILE = "Architecture windows.xlsx"
+
+# NCount's hard-coded CustomStartDate; its window runs to 31 Dec of the end year (default: this year)
+CUSTOM_START_DATE = pd.Timestamp(2025, 10, 1)
+CCOUNT_STATES = ["In production", "Retired"]
+NO_STATE = "(No lifecycle state)"
+
+# The architecture ID a decom row refers to, and the per-ID count column ('IT Architecture'[D])
+DECOM_ID = "ID_4"
+DECOM_COUNT = "D"
+
+WINDOWS = ["NCount", "NCount_new", "NCount_PrevMonth", "NCount_new PrevMonth"]
+
+# Per lifecycle state: the sorted Valid From days (datetime64[D] as int64) and the row
+# count including rows without a Valid From (CCount does not filter on the date)
+ValidFromIndex = namedtuple("ValidFromIndex", "states days totals")
+
+
+def build_valid_from_index(arch):
+    """Sorted Valid From days per lifecycle state - a window count is then two binary searches."""
+    states = arch[LIFECYCLE].fillna(NO_STATE)
+    dated = arch[VALID_FROM].notna()
+    days = arch[VALID_FROM].to_numpy("datetime64[D]").astype(np.int64)
+    names, arrays, totals = [], [], []
+    for state, rows in states.groupby(states, sort=True).indices.items():
+        names.append(state)
+        arrays.append(np.sort(days[rows][dated.to_numpy()[rows]]))
+        totals.append(len(rows))
+    return ValidFromIndex(names, arrays, pd.Series(totals, index=names, dtype=int))
+
+
+def _days(dates):
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def interval_counts(index, starts, ends):
+    """Rows per lifecycle state whose Valid From lies in [starts[i], ends[i]] (days, inclusive)."""
+    lo, hi = _days(starts), _days(ends)
+    counts = {
+        state: np.maximum(np.searchsorted(days, hi, "right") - np.searchsorted(days, lo, "left"), 0)
+        for state, days in zip(index.states, index.days)
+    }
+    return pd.DataFrame(counts, columns=index.states, index=range(len(lo)))
+
+
+def ccount(index):
+    """CCount: rows in production or retired (DAX compares the states case-insensitively)."""
+    wanted = {state.casefold() for state in CCOUNT_STATES}
+    return int(sum(total for state, total in index.totals.items() if state.casefold() in wanted))
+
+
+def _year_end(dates):
+    return dates.to_period("Y").to_timestamp(how="end").normalize()
+
+
+def window_dates(months, window, end_year=None):
+    """(start, end) DatetimeIndexes of `window` for each selected month.
+
+    NCount: CustomStartDate to 31 Dec of `end_year`. NCount_new: the months
+    after the selected one up to 31 Dec, except December itself (1-31 Dec).
+    NCount_PrevMonth: the month before. NCount_new PrevMonth: the month before
+    up to 31 Dec of its year, so Jan 2026 looks at Dec 2025 only.
+    """
+    months = pd.PeriodIndex(months, freq="M")
+    if window == "NCount":
+        end = pd.Timestamp(end_year or pd.Timestamp.today().year, 12, 31)
+        return pd.DatetimeIndex([CUSTOM_START_DATE] * len(months)), pd.DatetimeIndex([end] * len(months))
+    if window == "NCount_new":
+        start = pd.DatetimeIndex(np.where(months.month == 12, months.start_time, (months + 1).start_time))
+        return start, _year_end(start)
+    previous = months - 1
+    if window == "NCount_PrevMonth":
+        return previous.start_time, previous.end_time.normalize()
+    if window == "NCount_new PrevMonth":
+        return previous.start_time, _year_end(previous.start_time)
+    raise ValueError(f"unknown window {window!r}")
+
+
+def window_table(index, months, windows=WINDOWS, end_year=None):
+    """Every window count for every selected month, from one vectorised search.
+
+    One row per month x window with its dates, the total (the measure),
+    the CCount states within it and one column per lifecycle state.
+    """
+    months = pd.PeriodIndex(months, freq="M")
+    bounds = [window_dates(months, window, end_year) for window in windows]
+    starts = np.concatenate([start.to_numpy() for start, _ in bounds])
+    ends = np.concatenate([end.to_numpy() for _, end in bounds])
+    counts = interval_counts(index, starts, ends)
+
+    wanted = {state.casefold() for state in CCOUNT_STATES}
+    table = pd.DataFrame({
+        "Month": np.tile(months.start_time.to_numpy(), len(windows)),
+        "Window": np.repeat(windows, len(months)),
+        "Window Start": starts,
+        "Window End": ends,
+        "Count": counts.sum(axis=1).to_numpy(),
+        "CCount": counts[[state for state in index.states if state.casefold() in wanted]].sum(axis=1).to_numpy(),
+    })
+    table = pd.concat([table, counts], axis=1)
+    # Stable sort: each month keeps its windows in `windows` order
+    return table.sort_values("Month", kind="stable", ignore_index=True)
+
+
+def filter_decom(decom, year=None):
+    """'Filter - Decommissioning Apps': completed rows forecast to end in `year` (any year if None)."""
+    rows, _ = phase_flags(decom[PHASE])
+    if year is not None:
+        rows &= decom[FORECAST_END].dt.year == year
+    return decom[rows]
+
+
+def _id_key(ids):
+    # DAX compares text case-insensitively
+    return ids.astype(str).str.strip().str.casefold().where(ids.notna())
+
+
+def with_decom_counts(arch, decom, year=None):
+    """The architecture rows plus D, the number of filtered decom rows whose ID_4 is their ID.
+
+    One grouped count of the decom IDs, hash-joined onto the architecture
+    IDs, instead of a scan of the decom table per architecture row.
+    """
+    counts = _id_key(filter_decom(decom, year)[DECOM_ID]).value_counts()
+    enriched = arch.copy()
+    enriched[DECOM_COUNT] = _id_key(arch[ARCH_ID]).map(counts).fillna(0).astype(int)
+    return enriched
+
+
+def dcount(enriched):
+    """DCount: D summed over the architecture rows."""
+    return int(enriched[DECOM_COUNT].sum())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tabulate the IT Architecture Valid From window counts per month.")
+    parser.add_argument("input", help="IT Architecture extract (xlsx)")
+    parser.add_argument("years", type=int, nargs="+", help="calendar years to tabulate")
+    parser.add_argument("--sheet", default=ARCH_SHEET, help=f"sheet to read (default {ARCH_SHEET!r})")
+    parser.add_argument("--decom", metavar="FILE", help=f"add D from a compiled decom workbook (e.g. {DECOM_FILE!r})")
+    parser.add_argument("--decom-store", metavar="DIR", help="add D from a decom_store directory instead")
+    parser.add_argument("--decom-year", type=int, help="forecast end year of the counted decoms (default: last year given)")
+    parser.add_argument("--end-year", type=int, help="year NCount's window ends in (default: this year)")
+    parser.add_argument("--output", default=ARCH_METRICS_FILE, help=f"xlsx to write (default {ARCH_METRICS_FILE!r})")
+    add_profile_argument(parser)
+    args = parse_profiled_args(parser)
+
+    months = dashboard_months(args.years)
+    with stage("architecture_metrics", months=len(months)):
+        with stage("load_architecture"):
+            arch = load_architecture(args.input, args.sheet)
+            record(rows=len(arch))
+        with stage("index"):
+            index = build_valid_from_index(arch)
+            windows = window_table(index, months, end_year=args.end_year)
+            record(rows=len(windows))
+        sheets = {"Windows": windows, "Lifecycle States": index.totals.rename_axis(LIFECYCLE).reset_index(name="Rows")}
+        if args.decom or args.decom_store:
+            with stage("decom_join"):
+                decom = read_partitions(store_dir=args.decom_store) if args.decom_store else load_decom_extract(args.decom)
+                sheets["IT Architecture"] = with_decom_counts(arch, decom, args.decom_year or args.years[-1])
+                record(rows=len(decom), dcount=dcount(sheets["IT Architecture"]))
+        with stage("save", output=args.output):
+            write_tables(sheets, args.output)
+    summary = f"CCount {ccount(index)}"
+    if "IT Architecture" in sheets:
+        summary += f", DCount {dcount(sheets['IT Architecture'])}"
+    print(f"{len(windows)} month x window rows ({summary}) written to {args.output}")
@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+
+import openpyxl
+import pandas as pd
+
+from archer_data import ALL_OE_LIST, FLT_STATUS, GROUP_TYPE, LOCAL_TYPE, TOXIC_STATUS, compact_archer_frame, parse_archer_extract
+from detail_sheet import FLT_KEY_COLS, TOXIC_KEY_COLS
+from pivot_engine import build_cube, build_pivot, cube_slice
+from report_workbook import new_report_workbook
+from run_all_reports import REPORT_GENERATORS
+from synthetic_archer import synthetic_archer_extract, synthetic_oe_names, write_synthetic_extract
+from Group_FLT_Details import generate_group_flt_details
+from Group_Toxic_Details import generate_group_toxic_details
+from Local_FLT_Details import generate_local_flt_details
+from Local_Toxic_Details import generate_local_toxic_details
+
+
+RESULTS_FILE = "benchmark_results.json"
+
+# Every scenario is the baseline (the first value of each sweep) with one dimension
+# changed, so each sweep shows one axis
+SWEEPS = {
+    "rows": [10_000, 100_000, 1_000_000],
+    "oes": [len(ALL_OE_LIST), 50, 200],
+    "components": [200, 1_000, 5_000],
+}
+
+# The four detail sheets' slices, pivoted on their own to separate pivot time from layout time
+DETAIL_SLICES = [
+    (FLT_STATUS, GROUP_TYPE, FLT_KEY_COLS),
+    (FLT_STATUS, LOCAL_TYPE, FLT_KEY_COLS),
+    (TOXIC_STATUS, GROUP_TYPE, TOXIC_KEY_COLS),
+    (TOXIC_STATUS, LOCAL_TYPE, TOXIC_KEY_COLS),
+]
+# They get one row per synthetic OE (ALL_OE_LIST alone would drop every OE past the ninth)
+DETAIL_GENERATORS = {
+    generate_group_flt_details, generate_local_flt_details, generate_group_toxic_details, generate_local_toxic_details,
+}
+# Timed again inside the generators, so left out of a scenario's total
+NESTED_STAGES = {"pivot"}
+
+
+def scenarios(sweeps=SWEEPS):
+    baseline = {dim: values[0] for dim, values in sweeps.items()}
+    seen = []
+    for dim, values in sweeps.items():
+        for value in values:
+            scenario = dict(baseline, **{dim: value})
+            if scenario not in seen:
+                seen.append(scenario)
+    return seen
+
+
+def run_scenario(rows, oes, components, streaming=False, include_load=False, seed=0):
+    """Run the report pipeline on one synthetic extract, timing every stage (seconds)."""
+    stages = {}
+
+    def timed(stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        stages[stage] = round(time.perf_counter() - start, 6)
+        return result
+
+    df = synthetic_archer_extract(rows, oes, components, seed=seed)
+    oe_list = synthetic_oe_names(oes)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # === Load: parse an xlsx of the synthetic extract (slow to produce, so opt-in) ===
+        if include_load:
+            path = write_synthetic_extract(df, os.path.join(tmp, "synthetic_archer.xlsx"))
+            df = timed("load", parse_archer_extract, path)
+        else:
+            # Same frame the loader hands over: report columns only, text dimensions categorical
+            df = timed("compact", compact_archer_frame, df)
+
+        # === Filter + aggregate, then the detail pivots on their own ===
+        cube = timed("cube", build_cube, df)
+        timed("pivot", lambda: [
+            build_pivot(cube_slice(cube, status, component_type), oe_list, key_cols)
+            for status, component_type, key_cols in DETAIL_SLICES
+        ])
+
+        # === Layout + style, one stage per report sheet ===
+        wb = new_report_workbook(streaming=streaming)
+        for generate in REPORT_GENERATORS:
+            if generate in DETAIL_GENERATORS:
+                timed(generate.__name__, lambda: generate(wb, cube, oe_list=oe_list))
+            else:
+                timed(generate.__name__, generate, wb, cube)
+
+        timed("save", wb.save, os.path.join(tmp, "reports.xlsx"))
+
+    return {
+        "rows": rows,
+        "oes": oes,
+        "components": components,
+        "streaming": streaming,
+        "stages": stages,
+        "total": round(sum(seconds for stage, seconds in stages.items() if stage not in NESTED_STAGES), 6),
+    }
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "openpyxl": openpyxl.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the report pipeline on synthetic Archer extracts.")
+    parser.add_argument("--rows", type=int, nargs="+", default=SWEEPS["rows"])
+    parser.add_argument("--oes", type=int, nargs="+", default=SWEEPS["oes"])
+    parser.add_argument("--components", type=int, nargs="+", default=SWEEPS["components"])
+    parser.add_argument("--streaming", action="store_true", help="write the reports in write-only mode")
+    parser.add_argument("--load", action="store_true",
+                        help="also time parsing an xlsx of each extract (writing it is slow for big runs)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=RESULTS_FILE, help="JSON results file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scenario in scenarios({"rows": args.rows, "oes": args.oes, "components": args.components}):
+        result = run_scenario(**scenario, streaming=args.streaming, include_load=args.load, seed=args.seed)
+        results.append(result)
+        print(f"rows={result['rows']:>9,} oes={result['oes']:>4} components={result['components']:>5} "
+              f"total={result['total']:8.3f}s  "
+              + " ".join(f"{stage}={seconds:.3f}" for stage, seconds in result["stages"].items()))
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
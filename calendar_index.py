@@ -0,0 +1,201 @@
+import argparse
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from architecture_data import ARCH_SHEET, LIFECYCLE, VALID_FROM, load_architecture
+from architecture_metrics import NO_STATE
+from date_buckets import dashboard_months, write_tables
+from decom_data import DECOM_FILE, EXTRACT_DATE, FORECAST_END, PHASE, load_decom_extract
+from decom_metrics import COMPLETED, IN_PROGRESS, phase_flags
+from decom_store import latest_month, read_partitions
+from pivot_engine import STATUS_COL, TYPE_COL, VALUE_COL
+from run_profile import add_profile_argument, parse_profiled_args, record, stage
+from snapshot_history import DATE_COL, HISTORY_FILE, read_history
+
+
+WINDOWS_FILE = "Calendar windows.xlsx"
+
+# Event-dated sources (a row per thing that happened in a month, e.g. a Valid From):
+# prefix[i] holds the totals of every month before first_month + i, so any run of
+# months is one subtraction. `columns` label prefix's columns.
+CalendarIndex = namedtuple("CalendarIndex", "first_month columns prefix")
+
+# Snapshot sources (every extract restates the whole inventory): the totals of the
+# latest snapshot of each month, `months` being their sorted month ordinals. A window
+# is answered by one snapshot, never a sum over several.
+SnapshotIndex = namedtuple("SnapshotIndex", "months columns values")
+
+# The slicer windows of the dashboard measures, relative to a selected month
+WINDOWS = ["Month", "Previous month", "Year to date", "Rest of year", "Year"]
+
+
+def _month_table(frame, date_col, value_cols, by):
+    """month x (value, *by) totals of `frame`, months sorted (row counts if `value_cols` is None)."""
+    months = pd.to_datetime(frame[date_col]).dt.to_period("M")
+    data = frame.assign(_month=months)[months.notna()]
+    if value_cols is None:
+        data, value_cols = data.assign(Rows=1), ["Rows"]
+    table = data.groupby(["_month", *by], observed=True, dropna=False)[list(value_cols)].sum()
+    if by:
+        table = table.unstack(list(by), fill_value=0)
+    return table.sort_index()
+
+
+def build_calendar_index(frame, date_col, value_cols=None, by=()):
+    """Month prefix sums of `value_cols` (row counts if None), one column per value x `by` combination."""
+    table = _month_table(frame, date_col, value_cols, by)
+    if table.empty:
+        return CalendarIndex(None, table.columns, np.zeros((1, len(table.columns))))
+
+    first = table.index.min()
+    table = table.reindex(pd.period_range(first, table.index.max(), freq="M"), fill_value=0)
+    values = table.to_numpy(dtype=float)
+    prefix = np.vstack([np.zeros((1, values.shape[1])), values.cumsum(axis=0)])
+    return CalendarIndex(first, table.columns, prefix)
+
+
+def build_snapshot_index(frame, date_col, value_cols=None, by=()):
+    """Totals of each month's latest snapshot in `frame` (dated by `date_col`), as build_calendar_index."""
+    dates = pd.to_datetime(frame[date_col])
+    latest = dates.groupby(dates.dt.to_period("M")).transform("max")
+    table = _month_table(frame[dates.notna() & (dates == latest)], date_col, value_cols, by)
+    months = np.array([month.ordinal for month in table.index], dtype=np.int64)
+    return SnapshotIndex(months, table.columns, table.to_numpy(dtype=float).reshape(len(months), len(table.columns)))
+
+
+def window_sums(index, starts, ends):
+    """Totals of every window [starts[i], ends[i]] (months, inclusive) - O(1) per window.
+
+    `starts`/`ends` are month Periods or their ordinals; months outside the
+    index count as zero.
+    """
+    starts = np.array([getattr(month, "ordinal", month) for month in starts], dtype=np.int64)
+    ends = np.array([getattr(month, "ordinal", month) for month in ends], dtype=np.int64)
+    if index.first_month is None:
+        return pd.DataFrame(0.0, index=range(len(starts)), columns=index.columns)
+    n_months = len(index.prefix) - 1
+    lo = np.clip(starts - index.first_month.ordinal, 0, n_months)
+    hi = np.clip(ends - index.first_month.ordinal + 1, 0, n_months)
+    hi = np.maximum(hi, lo)
+    return pd.DataFrame(index.prefix[hi] - index.prefix[lo], columns=index.columns)
+
+
+def snapshot_values(index, starts, ends):
+    """Totals of the latest snapshot in each window [starts[i], ends[i]] (months, inclusive); 0 if it has none."""
+    starts = np.array([getattr(month, "ordinal", month) for month in starts], dtype=np.int64)
+    ends = np.array([getattr(month, "ordinal", month) for month in ends], dtype=np.int64)
+    found = np.searchsorted(index.months, ends, "right") - 1
+    # A snapshot older than the window start is stale, not the window's answer
+    in_window = found >= 0
+    in_window[in_window] = index.months[found[in_window]] >= starts[in_window]
+    values = np.vstack([np.zeros((1, len(index.columns))), index.values])[np.where(in_window, found + 1, 0)]
+    return pd.DataFrame(values, columns=index.columns)
+
+
+def window_values(index, starts, ends):
+    """Every window's answer: a snapshot for a SnapshotIndex, a sum over its months otherwise."""
+    if isinstance(index, SnapshotIndex):
+        return snapshot_values(index, starts, ends)
+    return window_sums(index, starts, ends)
+
+
+def window_bounds(months, window):
+    """(start, end) month ordinals of `window` around each selected month."""
+    ordinals = np.array([pd.Period(month, "M").ordinal for month in months], dtype=np.int64)
+    year_start = ordinals - ordinals % 12  # month ordinals count from January 1970
+    bounds = {
+        "Month": (ordinals, ordinals),
+        "Previous month": (ordinals - 1, ordinals - 1),  # EDATE(TargetDate, -1)
+        "Year to date": (year_start, ordinals),
+        "Rest of year": (ordinals + 1, year_start + 11),
+        "Year": (year_start, year_start + 11),
+    }
+    return bounds[window]
+
+
+def window_table(index, months, windows=WINDOWS):
+    """Every `windows` value for every selected month, as one long lookup table."""
+    months = [pd.Period(month, "M") for month in months]
+    parts = []
+    for window in windows:
+        sums = window_values(index, *window_bounds(months, window))
+        sums.columns = [
+            " / ".join(str(part) for part in col) if isinstance(col, tuple) else str(col) for col in sums.columns
+        ]
+        sums.insert(0, "Window", window)
+        sums.insert(0, "Month", [month.to_timestamp() for month in months])
+        parts.append(sums)
+    # Stable sort: each month keeps its windows in `windows` order
+    return pd.concat(parts, ignore_index=True).sort_values("Month", kind="stable", ignore_index=True)
+
+
+def toxic_index(history):
+    """Toxic Remediation assets per status x IT Component Type, one snapshot per month (see snapshot_history)."""
+    return build_snapshot_index(history, DATE_COL, [VALUE_COL], by=[STATUS_COL, TYPE_COL])
+
+
+def decom_index(decom, extract_month=None):
+    """Completed / in-progress apps of one extract (default: the latest), by Forecast End month.
+
+    Each extract restates every app, so only one is read - the windows
+    then count apps forecast to end in them, like CompletedCount and the
+    InProgress measures for that extract month.
+    """
+    if decom.empty:
+        # e.g. a decom_store without the requested extract month
+        return CalendarIndex(None, pd.Index([COMPLETED, IN_PROGRESS]), np.zeros((1, 2)))
+    months = decom[EXTRACT_DATE].dt.to_period("M")
+    extract_month = months.max() if extract_month is None else pd.Period(extract_month, "M")
+    rows = decom[months == extract_month]
+    completed, in_progress = phase_flags(rows[PHASE])
+    apps = pd.DataFrame({
+        FORECAST_END: rows[FORECAST_END],
+        COMPLETED: completed.astype(int),
+        IN_PROGRESS: in_progress.astype(int),
+    })
+    return build_calendar_index(apps, FORECAST_END, [COMPLETED, IN_PROGRESS])
+
+
+def architecture_index(arch):
+    """IT Architecture rows per lifecycle state, by Valid From month (see architecture_metrics)."""
+    return build_calendar_index(arch.assign(**{LIFECYCLE: arch[LIFECYCLE].fillna(NO_STATE)}), VALID_FROM, by=[LIFECYCLE])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute month / YTD / previous-month / rest-of-year windows.")
+    parser.add_argument("years", type=int, nargs="+", help="calendar years to tabulate")
+    parser.add_argument("--history", default=HISTORY_FILE, help=f"Toxic Remediation dataset (default {HISTORY_FILE!r})")
+    parser.add_argument("--decom", default=DECOM_FILE, help=f"compiled decom workbook (default {DECOM_FILE!r})")
+    parser.add_argument("--decom-store", metavar="DIR", help="read the decom rows from a decom_store directory instead")
+    parser.add_argument("--extract-month", metavar="YYYY-MM", help="decom extract to tabulate (default: the latest)")
+    parser.add_argument("--architecture", metavar="FILE", help="also tabulate an IT Architecture extract")
+    parser.add_argument("--architecture-sheet", default=ARCH_SHEET, help=f"its sheet (default {ARCH_SHEET!r})")
+    parser.add_argument("--output", default=WINDOWS_FILE, help=f"xlsx to write (default {WINDOWS_FILE!r})")
+    add_profile_argument(parser)
+    args = parse_profiled_args(parser)
+
+    months = dashboard_months(args.years)
+    tables = {}
+    with stage("calendar_index", months=len(months)):
+        if os.path.exists(args.history):
+            with stage("toxic"):
+                tables["Toxic Remediation"] = window_table(toxic_index(read_history(args.history)), months)
+        with stage("decom", extract_month=args.extract_month):
+            if args.decom_store:
+                # Only the one extract month's partition is read
+                extract_month = args.extract_month or latest_month(store_dir=args.decom_store)
+                decom = read_partitions([extract_month] if extract_month else [], store_dir=args.decom_store)
+            else:
+                decom = load_decom_extract(args.decom)
+            tables["Decommissioning"] = window_table(decom_index(decom, args.extract_month), months)
+        if args.architecture:
+            with stage("architecture"):
+                arch = load_architecture(args.architecture, args.architecture_sheet)
+                tables["IT Architecture"] = window_table(architecture_index(arch), months)
+        record(rows=sum(len(table) for table in tables.values()))
+        with stage("save", output=args.output):
+            write_tables(tables, args.output)
+    print(f"{', '.join(tables)} windows for {len(months)} months written to {args.output}")
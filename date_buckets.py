@@ -0,0 +1,77 @@
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from archer_data import ARCHER_FILE, snapshot_date
+
+
+# Which "Grand Total <label>" columns the FLT sheets get, e.g. "2025,2026Q1,next12m"
+BUCKETS_ENV = "REPORT_FLT_BUCKETS"
+DEFAULT_BUCKETS = "2025"
+
+# Toxic from Dates in [start, end) count towards the "Grand Total <label>" column
+DateBucket = namedtuple("DateBucket", "label start end")
+
+
+def year_bucket(year):
+    return DateBucket(str(year), pd.Timestamp(year, 1, 1), pd.Timestamp(year + 1, 1, 1))
+
+
+def quarter_bucket(year, quarter):
+    start = pd.Timestamp(year, 3 * quarter - 2, 1)
+    return DateBucket(f"{year}Q{quarter}", start, start + pd.DateOffset(months=3))
+
+
+def next_months_bucket(months, from_date):
+    start = pd.Timestamp(from_date).normalize()
+    return DateBucket(f"next {months} months", start, start + pd.DateOffset(months=months))
+
+
+def parse_buckets(spec, from_date=None):
+    """DateBuckets of a comma-separated spec: "2025", "2025Q3", "next12m" (months from `from_date`).
+
+    `from_date` defaults to the snapshot date in ARCHER_FILE's name, else today.
+    """
+    buckets = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        if re.fullmatch(r"\d{4}", item):
+            buckets.append(year_bucket(int(item)))
+        elif match := re.fullmatch(r"(\d{4})\s*Q([1-4])", item, re.IGNORECASE):
+            buckets.append(quarter_bucket(int(match.group(1)), int(match.group(2))))
+        elif match := re.fullmatch(r"next\s*(\d+)\s*m(?:onths?)?", item, re.IGNORECASE):
+            if from_date is None:
+                from_date = snapshot_date(ARCHER_FILE) or pd.Timestamp.today()
+            buckets.append(next_months_bucket(int(match.group(1)), from_date))
+        else:
+            raise ValueError(f"Unknown date bucket {item!r} (expected e.g. 2025, 2025Q3 or next12m)")
+    return buckets
+
+
+def flt_buckets():
+    """The FLT sheets' buckets, from ${REPORT_FLT_BUCKETS} (default: 2025)."""
+    return parse_buckets(os.environ.get(BUCKETS_ENV, DEFAULT_BUCKETS))
+
+
+def bucket_matrix(dates, buckets):
+    """dates x buckets booleans: whether each date falls in each bucket (NaT in none)."""
+    values = pd.DatetimeIndex(dates).to_numpy()[:, None]
+    starts = np.array([bucket.start for bucket in buckets], dtype="datetime64[ns]")
+    ends = np.array([bucket.end for bucket in buckets], dtype="datetime64[ns]")
+    return (values >= starts) & (values < ends)
+
+
+def dashboard_months(years):
+    """Every month of `years`, as the month Periods the dashboard windows are tabulated for."""
+    return [pd.Period(f"{year}-{month:02d}", "M") for year in years for month in range(1, 13)]
+
+
+def write_tables(tables, path):
+    """Save {sheet name: frame} atomically as one xlsx, a sheet per frame (no index)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f, pd.ExcelWriter(f, engine="openpyxl") as writer:
+        for sheet_name, table in tables.items():
+            table.to_excel(writer, sheet_name=sheet_name, index=False)
+    os.replace(tmp_path, path)
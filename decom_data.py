@@ -0,0 +1,108 @@
+from functools import lru_cache
+
+import pandas as pd
+
+from extract_cache import cached_frame
+from run_profile import frame_shape, record, stage
+
+
+DECOM_FILE = "Decomissioning_Compiled jan 2025-Jan 2026 (2).xlsx"
+DECOM_SHEET = "Raw Data"
+PLAN_SHEET = "Decom Plan Compiled"
+
+# Bump when the parsed frames change shape/types so old cache entries are ignored
+DECOM_CACHE_VARIANT = "v1"
+
+EXTRACT_DATE = "Date extracted"
+FORECAST_END = "Forecast End Date"
+PHASE = "Phase"
+OE_NAME = "OE Name"
+OE_CODE = "OE Code"
+
+# What the 'Decommissioning Apps' query keeps of "Raw Data" (second header row, de-duplicated)
+DECOM_COLUMNS = [
+    "Name", "ID", "ID_3", "ID_4", "ID_6", "Description", "Overal Program Status", FORECAST_END, PHASE,
+    "Application Name", "Domain", "Domain Area", EXTRACT_DATE,
+]
+
+
+def dedupe_headers(names):
+    """Column names made unique the Power Query way: repeats get _1, _2, ... in sheet order.
+
+    The counter runs over the whole header, so "Name", "Name", "ID", ..., "ID"
+    becomes "Name", "Name_1", "ID", ..., "ID_2" - the names the dashboard uses.
+    """
+    seen, unique, suffix = set(), [], 1
+    for name in names:
+        name = "" if pd.isna(name) else str(name).strip()
+        if name in seen:
+            name = f"{name}_{suffix}"
+            suffix += 1
+        seen.add(name)
+        unique.append(name)
+    return unique
+
+
+def normalise_decom(df):
+    """Types and derived columns of the 'Decommissioning Apps' table.
+
+    Drops rows without an OE name or forecast end date, keeps dates only
+    (no times) and splits "Allianz Thailand (TH)" into OE Name and OE Code.
+    """
+    df = df[df["Name"].notna() & (df["Name"].astype(str).str.strip() != "")].copy()
+    for col in (FORECAST_END, EXTRACT_DATE):
+        df[col] = pd.to_datetime(df[col], errors="coerce").dt.normalize()
+    df = df[df[FORECAST_END].notna()]
+
+    for col in df.columns.difference([FORECAST_END, EXTRACT_DATE]):
+        values = df[col]
+        df[col] = values.where(values.isna(), values.astype(str))
+    names = df["Name"].str.strip().str.rsplit(" ", n=1, expand=True).reindex(columns=[0, 1])
+    df.insert(0, OE_NAME, names[0])
+    df.insert(1, OE_CODE, names[1].str.replace("(", "", regex=False).str.replace(")", "", regex=False))
+    return df.reset_index(drop=True)
+
+
+def parse_decom_extract(file_path=DECOM_FILE, sheet_name=DECOM_SHEET):
+    with stage("read_excel"):
+        # Row 1 only groups the columns (OE, Program, ...); the names are on row 2
+        raw = pd.read_excel(file_path, sheet_name=sheet_name, header=None, skiprows=1)
+        record(**frame_shape(raw))
+    raw.columns = dedupe_headers(raw.iloc[0])
+    return normalise_decom(raw.iloc[1:][DECOM_COLUMNS])
+
+
+def parse_decom_plan(file_path=DECOM_FILE, sheet_name=PLAN_SHEET):
+    """Planned decommissionings per OE and year ('Decom Plan Compiled', Year renamed Date)."""
+    plan = pd.read_excel(file_path, sheet_name=sheet_name)
+    plan.columns = plan.columns.str.strip()
+    plan = plan.rename(columns={"Year": "Date"})
+    plan["Date"] = pd.to_datetime(plan["Date"], errors="coerce").dt.normalize()
+    plan["Plan Column(PD)"] = pd.to_numeric(plan["Plan Column(PD)"], errors="coerce").fillna(0).astype(int)
+    return plan
+
+
+@lru_cache(maxsize=None)
+def load_decom_extract(file_path=DECOM_FILE, sheet_name=DECOM_SHEET, use_cache=True):
+    """The normalised 'Decommissioning Apps' rows, parsed once per process (and cached on disk).
+
+    Shared between callers, so filter/copy it and never modify it in place.
+    """
+    if not use_cache:
+        return parse_decom_extract(file_path, sheet_name)
+    return cached_frame(
+        file_path, sheet_name,
+        lambda: parse_decom_extract(file_path, sheet_name),
+        variant=DECOM_CACHE_VARIANT,
+    )
+
+
+@lru_cache(maxsize=None)
+def load_decom_plan(file_path=DECOM_FILE, sheet_name=PLAN_SHEET, use_cache=True):
+    if not use_cache:
+        return parse_decom_plan(file_path, sheet_name)
+    return cached_frame(
+        file_path, sheet_name,
+        lambda: parse_decom_plan(file_path, sheet_name),
+        variant=DECOM_CACHE_VARIANT,
+    )
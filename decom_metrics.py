@@ -0,0 +1,130 @@
+import argparse
+
+import pandas as pd
+
+from decom_data import (
+    DECOM_FILE, EXTRACT_DATE, FORECAST_END, OE_CODE, OE_NAME, PHASE, load_decom_extract, load_decom_plan,
+)
+from date_buckets import write_tables
+from decom_store import STORE_DIR, read_partitions, window_month
+from run_profile import add_profile_argument, parse_profiled_args, record, stage
+
+
+DECOM_METRICS_FILE = "Decommissioning summary.xlsx"
+
+EXTRACT_MONTH = "Extract Month"
+FORECAST_YEAR = "Forecast Year"
+COMPLETED = "Completed"
+IN_PROGRESS = "In Progress"
+COUNT_DIMS = [OE_NAME, OE_CODE, EXTRACT_MONTH, FORECAST_YEAR]
+
+COMPLETED_PHASES = ["Completed"]
+IN_PROGRESS_PHASES = ["Baselining", "Not Started", "No entry"]
+
+
+def phase_flags(phases):
+    """(completed, in progress) masks of a Phase column.
+
+    DAX compares text case-insensitively, so "Not started" in the extract
+    matches the measures' "Not Started".
+    """
+    folded = phases.str.casefold()
+    return (
+        folded.isin([phase.casefold() for phase in COMPLETED_PHASES]),
+        folded.isin([phase.casefold() for phase in IN_PROGRESS_PHASES]),
+    )
+
+
+def decom_counts(df):
+    """Completed / in-progress apps per OE x extract month x forecast end year.
+
+    One grouped pass over the normalised rows; every CompletedCount /
+    InProgressForDetails window is a sum over rows of this table.
+    """
+    completed, in_progress = phase_flags(df[PHASE])
+    counts = pd.DataFrame({
+        OE_NAME: df[OE_NAME],
+        OE_CODE: df[OE_CODE],
+        EXTRACT_MONTH: df[EXTRACT_DATE].dt.to_period("M").dt.to_timestamp(),
+        FORECAST_YEAR: df[FORECAST_END].dt.year,
+        COMPLETED: completed.astype(int),
+        IN_PROGRESS: in_progress.astype(int),
+    })
+    return counts.groupby(COUNT_DIMS, dropna=False)[[COMPLETED, IN_PROGRESS]].sum().reset_index()
+
+
+def plan_by_year(plan):
+    """Planned decommissionings per OE and year (PlanValue)."""
+    return (
+        plan.assign(Year=plan["Date"].dt.year)
+        .groupby(["Name", OE_CODE, "Year"], dropna=False)["Plan Column(PD)"]
+        .sum()
+        .reset_index()
+    )
+
+
+def extract_window(counts, year=None, month=None, previous_month=False):
+    """(extract month, forecast year) the slicer-driven decom measures look at, or None.
+
+    Month selected: that month (or the one before with `previous_month`) and
+    its year. Only a year: the latest extract month in that year. Nothing:
+    the latest extract month overall and its year.
+    """
+    months = counts[EXTRACT_MONTH]
+    if month is not None:
+        target = pd.Timestamp(year, month, 1)
+        if previous_month:
+            target -= pd.DateOffset(months=1)
+        return target, target.year
+    if year is not None:
+        in_year = months[months.dt.year == year]
+        return (in_year.max(), year) if len(in_year) else None
+    return (months.max(), months.max().year) if len(months) else None
+
+
+def window_count(counts, column, year=None, month=None, previous_month=False, oe_code=None):
+    """`column` summed over one extract_window (0 if the window has no data)."""
+    window = extract_window(counts, year, month, previous_month)
+    if window is None:
+        return 0
+    extract_month, forecast_year = window
+    rows = (counts[EXTRACT_MONTH] == extract_month) & (counts[FORECAST_YEAR] == forecast_year)
+    if oe_code is not None:
+        rows &= counts[OE_CODE] == oe_code
+    return int(counts.loc[rows, column].sum())
+
+
+def store_window_count(column, year=None, month=None, previous_month=False, oe_code=None, store_dir=STORE_DIR):
+    """window_count over a decom_store, reading only the window's extract month partition."""
+    window = window_month(year, month, previous_month, store_dir)
+    if window is None:
+        return 0
+    extract_month, forecast_year = window
+    counts = decom_counts(read_partitions([extract_month], store_dir))
+    return window_count(counts, column, forecast_year, extract_month.month, oe_code=oe_code)
+
+
+def write_decom_metrics(counts, plan, path):
+    write_tables({"Decom Counts": counts, "Decom Plan": plan}, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-aggregate the compiled decommissioning workbook for the dashboard.")
+    parser.add_argument("--input", default=DECOM_FILE, help=f"compiled decom workbook (default {DECOM_FILE!r})")
+    parser.add_argument("--store", metavar="DIR", help="read the decom rows from a decom_store directory instead")
+    parser.add_argument("--output", default=DECOM_METRICS_FILE, help=f"xlsx to write (default {DECOM_METRICS_FILE!r})")
+    add_profile_argument(parser)
+    args = parse_profiled_args(parser)
+
+    with stage("decom_metrics"):
+        with stage("load_decom"):
+            decom = read_partitions(store_dir=args.store) if args.store else load_decom_extract(args.input)
+            plan = load_decom_plan(args.input)
+            record(rows=len(decom))
+        with stage("aggregate"):
+            counts = decom_counts(decom)
+            plan_years = plan_by_year(plan)
+            record(rows=len(counts))
+        with stage("save", output=args.output):
+            write_decom_metrics(counts, plan_years, args.output)
+    print(f"{len(counts)} OE x extract month x forecast year rows written to {args.output}")
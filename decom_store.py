@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import re
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from decom_data import (
+    DECOM_COLUMNS, DECOM_FILE, DECOM_SHEET, EXTRACT_DATE, FORECAST_END, OE_CODE, OE_NAME, dedupe_headers,
+    normalise_decom,
+)
+from extract_cache import FRAME_FORMAT, file_digest, read_frame, write_frame
+from run_profile import add_profile_argument, parse_profiled_args, record, stage
+
+
+STORE_DIR = os.environ.get("DECOM_STORE_DIR", "decom_store")
+PARTITION_PREFIX = "extract_month="
+# Digest of the workbook last ingested, so re-running on the same file does nothing
+SOURCE_FILE = "source.json"
+
+
+def _partition_path(store_dir, month):
+    return os.path.join(store_dir, f"{PARTITION_PREFIX}{month}", f"part.{FRAME_FORMAT}")
+
+
+def stored_months(store_dir=STORE_DIR):
+    """Extract months (pd.Period) that have a partition in the store, oldest first."""
+    if not os.path.isdir(store_dir):
+        return []
+    months = []
+    for name in os.listdir(store_dir):
+        match = re.fullmatch(re.escape(PARTITION_PREFIX) + r"(\d{4}-\d{2})", name)
+        if match and os.path.exists(_partition_path(store_dir, match.group(1))):
+            months.append(pd.Period(match.group(1), "M"))
+    return sorted(months)
+
+
+def write_partition(df, month, store_dir=STORE_DIR):
+    path = _partition_path(store_dir, month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_frame(df, path)
+
+
+def _empty_partition():
+    """No rows, with the columns and dtypes normalise_decom gives a stored month."""
+    return pd.DataFrame({
+        col: pd.Series(dtype="datetime64[ns]" if col in (FORECAST_END, EXTRACT_DATE) else "str")
+        for col in [OE_NAME, OE_CODE] + DECOM_COLUMNS
+    })
+
+
+def read_partitions(months=None, store_dir=STORE_DIR):
+    """Rows of the given extract months (default: all), reading only their partitions."""
+    months = stored_months(store_dir) if months is None else [pd.Period(month, "M") for month in months]
+    parts = [read_frame(_partition_path(store_dir, month)) for month in months
+             if os.path.exists(_partition_path(store_dir, month))]
+    if not parts:
+        return _empty_partition()
+    return pd.concat(parts, ignore_index=True)
+
+
+def latest_month(year=None, store_dir=STORE_DIR):
+    """Latest stored extract month (in `year`, if given), from the partition names alone."""
+    months = [month for month in stored_months(store_dir) if year is None or month.year == year]
+    return months[-1] if months else None
+
+
+def window_month(year=None, month=None, previous_month=False, store_dir=STORE_DIR):
+    """(extract month, forecast year) of a slicer window, resolved from the partition names.
+
+    Same rules as decom_metrics.extract_window; decom_metrics.store_window_count
+    then reads only the returned month's partition.
+    """
+    if month is not None:
+        target = pd.Period(f"{year}-{month:02d}", "M") - (1 if previous_month else 0)
+        return target, target.year
+    latest = latest_month(year, store_dir)
+    if latest is None:
+        return None
+    return latest, latest.year if year is None else year
+
+
+def _source_digest(store_dir):
+    try:
+        with open(os.path.join(store_dir, SOURCE_FILE), encoding="utf-8") as f:
+            return json.load(f).get("digest")
+    except (OSError, ValueError):
+        return None
+
+
+def _cell(row, pos):
+    # pd.read_excel reads empty text cells as missing; keep the stored rows identical
+    value = row[pos] if pos < len(row) else None
+    return None if value == "" else value
+
+
+def _extract_month(value):
+    date = pd.to_datetime(value, errors="coerce")
+    return None if pd.isna(date) else pd.Period(date, "M")
+
+
+def ingest(file_path=DECOM_FILE, sheet_name=DECOM_SHEET, store_dir=STORE_DIR, replace=False):
+    """Add the extract months of the compiled workbook that the store does not have yet.
+
+    The sheet is streamed row by row; rows of months already stored are
+    skipped before any frame is built, so a monthly refresh only normalises
+    and writes the new month; the very file last ingested is not read at all.
+    With `replace` every month is rewritten. Rows
+    without a Date extracted are left out (every measure filters on it).
+    Returns the months written.
+    """
+    digest = file_digest(file_path)
+    if not replace and digest == _source_digest(store_dir):
+        record(months=0, skipped_rows=0)
+        return []
+
+    known = set() if replace else set(stored_months(store_dir))
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet_name].iter_rows(values_only=True)
+        next(rows, None)  # group row (OE, Program, ...)
+        columns = dedupe_headers(next(rows, ()))
+        missing = [col for col in DECOM_COLUMNS if col not in columns]
+        if missing:
+            raise ValueError(f"{sheet_name!r} in {file_path!r} has no column(s) {missing}")
+        positions = [columns.index(col) for col in DECOM_COLUMNS]
+        date_pos = columns.index(EXTRACT_DATE)
+
+        new_rows, skipped = {}, 0
+        for row in rows:
+            month = _extract_month(row[date_pos]) if date_pos < len(row) else None
+            if month is None or month in known:
+                skipped += 1
+                continue
+            new_rows.setdefault(month, []).append([_cell(row, pos) for pos in positions])
+    finally:
+        wb.close()
+
+    for month, month_rows in sorted(new_rows.items()):
+        df = normalise_decom(pd.DataFrame(month_rows, columns=DECOM_COLUMNS))
+        write_partition(df, month, store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, SOURCE_FILE), "w", encoding="utf-8") as f:
+        json.dump({"file": os.path.basename(file_path), "digest": digest}, f)
+    record(months=len(new_rows), skipped_rows=skipped)
+    return sorted(new_rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the compiled decom workbook as a month-partitioned store.")
+    parser.add_argument("--input", default=DECOM_FILE, help=f"compiled decom workbook (default {DECOM_FILE!r})")
+    parser.add_argument("--store", default=STORE_DIR, help=f"store directory (default {STORE_DIR!r})")
+    parser.add_argument("--replace", action="store_true", help="rewrite every extract month, not just new ones")
+    add_profile_argument(parser)
+    args = parse_profiled_args(parser)
+    with stage("decom_ingest", replace=args.replace):
+        written = ingest(args.input, store_dir=args.store, replace=args.replace)
+    print(f"{len(written)} extract month(s) added; {len(stored_months(args.store))} in {args.store}")
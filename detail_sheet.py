@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+from openpyxl.utils import get_column_letter
+
+from archer_data import ALL_OE_LIST
+from date_buckets import bucket_matrix
+from pivot_engine import build_pivot, cube_slice
+from run_profile import frame_shape, record, stage
+from sheet_layout import region
+from sheet_writer import array_text_lengths, fit_widths, text_length, write_sheet
+
+
+FLT_KEY_COLS = ["IT Component Name", "Release", "Toxic from Date"]
+TOXIC_KEY_COLS = ["IT Component Name", "Release"]
+
+START_COL = 4  # first component column (D)
+FIRST_DATA_ROW = 7
+FREEZE_PANES = "D7"
+
+
+def component_name_runs(component_keys):
+    """(first, last) column of every run of equal consecutive IT Component Names."""
+    runs = []
+    for idx, key in enumerate(component_keys):
+        col = START_COL + idx
+        if runs and component_keys[idx - 1][0] == key[0]:
+            runs[-1][1] = col
+        else:
+            runs.append([col, col])
+    return runs
+
+
+def date_text(key):
+    """Row 6 text of a component: its Toxic from Date, "" if missing, None without dates."""
+    if len(key) < 3:
+        return None
+    return key[2].strftime("%m/%d/%Y") if pd.notna(key[2]) else ""
+
+
+def component_dates(component_keys):
+    """Toxic from Date of every component column (NaT if missing or not keyed by date)."""
+    return pd.DatetimeIndex([key[2] if len(key) > 2 else pd.NaT for key in component_keys])
+
+
+def bucket_mask(component_keys, buckets):
+    """components x buckets: which component columns have a Toxic from Date in each bucket."""
+    return bucket_matrix(component_dates(component_keys), buckets)
+
+
+def bucket_header(bucket):
+    return f"Grand Total {bucket.label}"
+
+
+def pivot_totals(pivot, in_buckets):
+    """Row sums, per-bucket row sums (OEs x buckets) and column sums of the pivot.
+
+    All bucket totals come from one product with the `in_buckets` mask, however
+    many buckets there are.
+    """
+    matrix = pivot.to_numpy()
+    return matrix.sum(axis=1), matrix @ in_buckets, matrix.sum(axis=0)
+
+
+def component_text_lengths(pivot, zero_text=None):
+    """Text lengths of the component columns, plus (first, last, length) of merged names.
+
+    Taken from the pivot itself (values, column totals, header keys), so sizing
+    the columns never goes back over the written cells.
+    """
+    component_keys = list(pivot.columns)
+    matrix = pivot.to_numpy()
+    value_lengths = np.maximum(
+        array_text_lengths(matrix, zero_text),
+        array_text_lengths(matrix.sum(axis=0, keepdims=True)),
+    )
+    lengths = {
+        START_COL + idx: max(int(value_lengths[idx]), text_length([key[1], date_text(key)]))
+        for idx, key in enumerate(component_keys)
+    }
+    spans = []
+    for first, last in component_name_runs(component_keys):
+        name_length = text_length([component_keys[first - START_COL][0]])
+        if first == last:
+            lengths[first] = max(lengths[first], name_length)
+        else:
+            spans.append((first, last, name_length))
+    return lengths, spans
+
+
+def detail_widths(pivot, status, component_type, buckets=()):
+    """Column widths of the detail sheet, from the pivot and its totals."""
+    component_keys = list(pivot.columns)
+    n = len(component_keys)
+    row_sums, bucket_sums, _ = pivot_totals(pivot, bucket_mask(component_keys, buckets))
+
+    lengths, spans = component_text_lengths(pivot, zero_text="-")
+    lengths[1] = text_length(["Number of IT Assets", "Current Status", status, "Grand Total"])
+    lengths[2] = text_length(["IT Component Type", component_type])
+    lengths[3] = text_length(["Allianz OE Name"] + list(pivot.index))
+    total_columns = [("Grand Total", row_sums)]
+    total_columns += [(bucket_header(bucket), bucket_sums[:, idx]) for idx, bucket in enumerate(buckets)]
+    for col, (header, sums) in enumerate(total_columns, start=START_COL + n):
+        lengths[col] = max(
+            text_length([header, sums.sum().item()]),
+            int(array_text_lengths(sums[:, None])[0]),
+        )
+
+    # Row 3 labels sit over the first component columns (or the totals if there are few)
+    for col, label in enumerate(_header_labels(component_keys), start=START_COL):
+        lengths[col] = max(lengths.get(col, 0), len(label))
+    return fit_widths(lengths, spans)
+
+
+def _header_labels(component_keys):
+    if component_keys and len(component_keys[0]) < 3:
+        return ["IT Component Name", "Release"]
+    return ["IT Component Name", "Release", "Toxic from Date"]
+
+
+def detail_rows(pivot, status, component_type, buckets=()):
+    """Yield the detail sheet's values row by row, from row 1 down to the Grand Total row."""
+    component_keys = list(pivot.columns)
+    row_sums, bucket_sums, col_totals = pivot_totals(pivot, bucket_mask(component_keys, buckets))
+    run_starts = {first for first, _ in component_name_runs(component_keys)}
+    total_cols = 1 + len(buckets)
+
+    yield []
+    yield []
+
+    # === Row 3: title + column-area labels ===
+    labels = _header_labels(component_keys)
+    yield ["Number of IT Assets", None, None] + [
+        labels[idx] if idx < len(labels) else None
+        for idx in range(len(component_keys) + total_cols)
+    ]
+
+    # === Rows 4-6: component name (merged per run), release, toxic from date ===
+    yield [None] * 3 + [
+        key[0] if START_COL + idx in run_starts else None
+        for idx, key in enumerate(component_keys)
+    ] + ["Grand Total"] + [bucket_header(bucket) for bucket in buckets]
+    yield [None] * 3 + [key[1] for key in component_keys]
+    yield ["Current Status", "IT Component Type", "Allianz OE Name"] + [date_text(key) for key in component_keys]
+
+    # === Data rows: one per OE ===
+    rows = zip(pivot.index, pivot.to_numpy().tolist(), row_sums.tolist(), bucket_sums.tolist())
+    for oe, row_values, row_sum, row_bucket_sums in rows:
+        values = ["-" if val == 0 else val for val in row_values]
+        yield [status, component_type, oe] + values + [row_sum] + row_bucket_sums
+
+    # === Total row ===
+    totals = col_totals.tolist() + [row_sums.sum().item()] + bucket_sums.sum(axis=0).tolist()
+    yield ["Grand Total", None, None] + totals
+
+
+def detail_regions(pivot, buckets=(), highlight=False):
+    """Style regions of the detail sheet: header band, data body, total row, total columns."""
+    component_keys = list(pivot.columns)
+    gt_col = START_COL + len(component_keys)
+    last_col = gt_col + len(buckets)
+    data_rows = range(FIRST_DATA_ROW, FIRST_DATA_ROW + len(pivot.index))
+    total_row = range(data_rows.stop, data_rows.stop + 1)
+    all_cols = range(1, last_col + 1)
+    value_cols = range(START_COL, last_col + 1)
+
+    regions = [
+        # Header band
+        region(range(3, 4), value_cols, "top_bottom_border", "center"),
+        region(range(4, 7), range(START_COL, gt_col + 1), "side_border", "center"),
+        region(range(6, 7), range(1, START_COL), "top_bottom_border"),
+        # Data body
+        region(data_rows, all_cols, "side_border"),
+        region(data_rows, value_cols, "center"),
+        # Total row
+        region(total_row, all_cols, "lilac_total"),
+        region(total_row, value_cols, "bold", "center"),
+    ]
+    if buckets:
+        # Grand Total <bucket> column headers
+        bucket_cols = range(gt_col + 1, last_col + 1)
+        regions.append(region(range(4, 7), bucket_cols, "center"))
+        regions.append(region(range(4, 5), bucket_cols, "green_header", "bold"))
+    if highlight and buckets:
+        # Shade the component columns of the first bucket
+        first_bucket = bucket_mask(component_keys, buckets[:1])[:, 0]
+        regions.append(region(data_rows, {START_COL + idx for idx in first_bucket.nonzero()[0]}, "green_2025"))
+    return regions
+
+
+def detail_merges(component_keys, buckets=()):
+    """Runs of equal component names in row 4, total headers down rows 4-6."""
+    col = get_column_letter
+    merges = [f"{col(first)}4:{col(last)}4" for first, last in component_name_runs(component_keys) if last > first]
+    gt_col = START_COL + len(component_keys)
+    merges += [f"{col(c)}4:{col(c)}6" for c in range(gt_col, gt_col + 1 + len(buckets))]
+    return merges
+
+
+def generate_detail_sheet(wb, data, title, status, component_type, key_cols,
+                          buckets=(), highlight=False, oe_list=ALL_OE_LIST):
+    """OE x component detail sheet for one status/type slice of the cube `data`.
+
+    FLT sheets pass date_buckets `buckets` to get a "Grand Total <label>"
+    column per bucket, and `highlight` to shade the first bucket's component
+    columns. The sheet has one row per `oe_list` entry, in that order.
+    """
+    with stage("pivot"):
+        pivot = build_pivot(cube_slice(data, status, component_type), oe_list, key_cols)
+        record(**frame_shape(pivot))
+    with stage("widths"):
+        widths = detail_widths(pivot, status, component_type, buckets)
+
+    write_sheet(
+        wb, title, detail_rows(pivot, status, component_type, buckets),
+        regions=detail_regions(pivot, buckets, highlight),
+        merges=detail_merges(list(pivot.columns), buckets),
+        freeze_panes=FREEZE_PANES,
+        widths=widths,
+        show_grid_lines=False,
+    )
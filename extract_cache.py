@@ -0,0 +1,144 @@
+import hashlib
+import os
+import re
+import zipfile
+from contextlib import contextmanager
+
+import pandas as pd
+
+from xlsx_package import sheet_source_parts
+
+
+CACHE_DIR = os.environ.get("REPORT_CACHE_DIR", ".report_cache")
+
+# How frames are kept on disk here and in decom_store
+try:
+    import pyarrow  # noqa: F401
+    FRAME_FORMAT = "parquet"
+except ImportError:
+    # No parquet engine available: still skip the xlsx parse, just less compactly
+    FRAME_FORMAT = "pkl"
+
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """SHA-256 of the file contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sheet_digest(file_path, sheet_name, chunk_size=1 << 20):
+    """SHA-256 of the parts one sheet of an xlsx is read from (its XML, shared strings and styles).
+
+    Unlike file_digest this stays the same when other sheets are saved into
+    the workbook or a save only stamps new document properties, which is
+    what every report run does to the Archer extract. Anything that is not
+    an xlsx package (or has no such sheet) is hashed whole.
+    """
+    if not zipfile.is_zipfile(file_path):
+        return file_digest(file_path, chunk_size)
+    with zipfile.ZipFile(file_path) as package:
+        parts = sheet_source_parts(package, sheet_name)
+        if parts is None:
+            return file_digest(file_path, chunk_size)
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8") + b"\0")
+            with package.open(part) as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9]+", "_", str(text)).strip("_")
+
+
+def _cache_prefix(file_path, sheet_name, variant):
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return "-".join(_slug(part) for part in (stem, sheet_name, variant) if part) + "-"
+
+
+def _variant_family(variant):
+    # "v1" -> "v2" is a new version of the same frame; "cells-v1" is another frame of the sheet
+    return re.sub(r"v\d+$", "", _slug(variant or ""))
+
+
+def write_frame(df, path):
+    """Save `df` atomically in FRAME_FORMAT."""
+    tmp_path = path + ".tmp"
+    if FRAME_FORMAT == "parquet":
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_frame(path):
+    if FRAME_FORMAT == "parquet":
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def cached_frame(file_path, sheet_name, build, variant="", cache_dir=None):
+    """Return `build()` for one sheet of `file_path`, reusing an on-disk copy.
+
+    Entries are keyed by the sheet's content hash (sheet_digest), the sheet
+    name and `variant` (bump it when `build` starts producing a different
+    frame), so a new extract or a changed loader misses the cache by itself.
+    Writing a fresh entry removes the sheet's older ones of the same variant
+    family, including those of earlier variant versions ("v1" once "v2" is
+    written) - but not the other frames cached for it ("cells-v1").
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    prefix = _cache_prefix(file_path, sheet_name, variant)
+    digest = sheet_digest(file_path, sheet_name)[:16]
+    path = os.path.join(cache_dir, f"{prefix}{digest}.{FRAME_FORMAT}")
+
+    if os.path.exists(path):
+        try:
+            return read_frame(path)
+        except Exception:
+            # Corrupt/partial entry: fall through and rebuild it
+            pass
+
+    df = build()
+    os.makedirs(cache_dir, exist_ok=True)
+    sheet_prefix, family = _cache_prefix(file_path, sheet_name, ""), _variant_family(variant)
+    for name in os.listdir(cache_dir):
+        rest = name[len(sheet_prefix):]
+        entry = name.startswith(sheet_prefix) and re.fullmatch(r"(?:(\w+)-)?[0-9a-f]{16}\.\w+", rest)
+        if entry and _variant_family(entry.group(1)) == family and name != os.path.basename(path):
+            os.remove(os.path.join(cache_dir, name))
+    write_frame(df, path)
+    return df
+
+
+def carry_over(file_path, sheet_name, old_digest, cache_dir=None):
+    """Re-key the sheet's entries (any variant) from `old_digest` to its current sheet_digest.
+
+    Only for a save into `file_path` that leaves the sheet's values as they
+    were but may re-serialise its XML, like openpyxl re-saving the extract
+    with the report sheets in it; the next run then still hits the cache.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    old, new = old_digest[:16], sheet_digest(file_path, sheet_name)[:16]
+    if old == new or not os.path.isdir(cache_dir):
+        return
+    prefix = _cache_prefix(file_path, sheet_name, "")
+    for name in os.listdir(cache_dir):
+        entry = name.startswith(prefix) and re.fullmatch(rf"((?:\w+-)?){old}(\.\w+)", name[len(prefix):])
+        if entry:
+            renamed = f"{prefix}{entry.group(1)}{new}{entry.group(2)}"
+            os.replace(os.path.join(cache_dir, name), os.path.join(cache_dir, renamed))
+
+
+@contextmanager
+def sheet_unchanged(file_path, sheet_name, cache_dir=None):
+    """Around a save into `file_path` that does not touch `sheet_name`: keep its cache entries (see carry_over)."""
+    before = sheet_digest(file_path, sheet_name) if os.path.exists(file_path) else None
+    yield
+    if before is not None:
+        carry_over(file_path, sheet_name, before, cache_dir)
@@ -0,0 +1,112 @@
+import argparse
+import os
+
+import pandas as pd
+from openpyxl.chart import LineChart, Reference
+
+from archer_data import ALL_OE_LIST, FLT_STATUS, GROUP_TYPE, LOCAL_TYPE, load_archer_cube
+from pivot_engine import OE_COL, TYPE_COL, VALUE_COL, cube_slice
+from run_profile import add_profile_argument, parse_profiled_args, record, stage
+
+
+PROJECTION_FILE = "FLT projection.xlsx"
+DATE_COL = "Toxic from Date"
+FREQUENCIES = {"Y": "year", "Q": "quarter", "M": "month"}
+
+
+def flt_projection(cube, freq="Y", start=None, periods=None, include_overdue=True, cumulative=False):
+    """FLT assets per IT Component Type x OE that become Toxic in each period.
+
+    Toxic from Dates are bucketed into `freq` periods ("Y", "Q" or "M") in one
+    vectorised pass over the cube cells. Columns run `periods` periods from
+    `start` (default: the first to the last date in the data). Assets due
+    before `start` but still FLT count in the first column unless
+    `include_overdue` is False; dates after the horizon and missing dates are
+    left out. With `cumulative` each column holds everything that has become
+    Toxic by the end of that period (the forward curve).
+    """
+    cells = cube_slice(cube, FLT_STATUS)
+    cells = cells[cells[DATE_COL].notna()]
+    period = cells[DATE_COL].dt.to_period(freq)
+    if start is None:
+        start = period.min() if len(period) else pd.Period.now(freq)
+    start = pd.Period(start, freq)
+    if periods is None:
+        periods = max(period.max().ordinal - start.ordinal + 1, 1) if len(period) else 1
+
+    # Whole-column integer offsets from `start`: no per-cell date checks
+    offset = period.array.asi8 - start.ordinal
+    if include_overdue:
+        offset = offset.clip(min=0)
+    keep = (offset >= 0) & (offset < periods)
+    table = (
+        cells[keep].assign(_period=offset[keep])
+        .groupby([TYPE_COL, OE_COL, "_period"], observed=True)[VALUE_COL]
+        .sum()
+        .unstack("_period", fill_value=0)
+    )
+
+    types = [GROUP_TYPE, LOCAL_TYPE] + sorted(set(table.index.get_level_values(0)) - {GROUP_TYPE, LOCAL_TYPE})
+    oes = ALL_OE_LIST + sorted(set(table.index.get_level_values(1)) - set(ALL_OE_LIST))
+    table = table.reindex(
+        index=pd.MultiIndex.from_product([types, oes], names=[TYPE_COL, OE_COL]),
+        columns=range(periods),
+        fill_value=0,
+    )
+    table.columns = pd.period_range(start, periods=periods, freq=freq)
+    if cumulative:
+        table = table.cumsum(axis=1)
+    return table
+
+
+def forward_curve(cube, freq="M", start=None, periods=None):
+    """Cumulative FLT assets turned Toxic by the end of each period, per IT Component Type and in total."""
+    cumulative = flt_projection(cube, freq, start, periods, cumulative=True)
+    curve = cumulative.groupby(level=TYPE_COL, sort=False).sum().T
+    curve.columns.name = None
+    curve["Total"] = curve.sum(axis=1)
+    curve.index.name = FREQUENCIES.get(freq, freq).capitalize()
+    return curve
+
+
+def write_projection(projection, curve, path):
+    """Per-OE projection and the forward curve (with a line chart) as one xlsx."""
+    projection = projection.rename(columns=str)
+    curve = curve.set_axis(curve.index.astype(str))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f, pd.ExcelWriter(f, engine="openpyxl") as writer:
+        projection.to_excel(writer, sheet_name="By OE")
+        curve.to_excel(writer, sheet_name="Forward curve")
+
+        ws = writer.sheets["Forward curve"]
+        chart = LineChart()
+        chart.title = "FLT assets turned Toxic (cumulative)"
+        chart.y_axis.title = "Number of IT Assets"
+        chart.x_axis.title = curve.index.name
+        n_rows, n_cols = len(curve) + 1, len(curve.columns) + 1
+        chart.add_data(Reference(ws, min_col=2, max_col=n_cols, min_row=1, max_row=n_rows), titles_from_data=True)
+        chart.set_categories(Reference(ws, min_col=1, min_row=2, max_row=n_rows))
+        ws.add_chart(chart, ws.cell(row=2, column=n_cols + 2).coordinate)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Project when FLT assets become Toxic, from their Toxic from Date.")
+    parser.add_argument("--freq", choices=list(FREQUENCIES), default="Y", help="bucket by year, quarter or month (default: Y)")
+    parser.add_argument("--start", help="first period, e.g. 2025, 2025Q3 or 2025-07 (default: earliest Toxic from Date)")
+    parser.add_argument("--periods", type=int, metavar="N", help="number of periods (default: up to the latest date)")
+    parser.add_argument("--output", default=PROJECTION_FILE, help=f"xlsx to write (default {PROJECTION_FILE!r})")
+    parser.add_argument("--chunk-rows", type=int, metavar="N", help="stream the Archer extract N rows at a time")
+    add_profile_argument(parser)
+    args = parse_profiled_args(parser)
+
+    with stage("flt_projection", freq=args.freq):
+        with stage("load_archer_cube"):
+            data = load_archer_cube(chunk_rows=args.chunk_rows)
+        with stage("project"):
+            projection = flt_projection(data, args.freq, args.start, args.periods)
+            curve = forward_curve(data, args.freq, args.start, args.periods)
+            record(periods=len(curve))
+        with stage("save", output=args.output):
+            write_projection(projection, curve, args.output)
+    print(f"{len(curve)} {FREQUENCIES[args.freq]}(s) projected to {args.output}")
@@ -1,205 +1,113 @@
-import pandas as pd
-import openpyxl
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl import Workbook
+from archer_data import ALL_OE_LIST, FLT_STATUS, LOCAL_TYPE, load_archer_cube
 from openpyxl.utils import get_column_letter
-from collections import defaultdict
-from openpyxl.styles import Font
-from openpyxl.styles import Border, Side
-
-
-# === Step 1: Load file and clean ===
-file_path = "8 July 2025 Archer Toxic sharing.xlsx"
-df = pd.read_excel(file_path, sheet_name="Archer Search Report (2)")
-df.columns = df.columns.str.strip()
-
-# === Step 2: Filter relevant FLT + Local rows ===
-flt_local_df = df[
-    (df["Current Status"] == "Forward Looking Toxic") &
-    (df["IT Component Type"] == "Regional/Local")
-]
-
-# === Step 3: Ensure all OEs are present ===
-all_oe_list = [
-    "Allianz China - Holding", "Allianz China - P&C", "Allianz Indonesia",
-    "Allianz Malaysia", "Allianz Philippine - L&H", "Allianz Singapore",
-    "Allianz Sri Lanka", "Allianz Taiwan - Life", "Allianz Thailand"
-]
-
-flt_local_df = flt_local_df[
-    ["Allianz OE Name", "IT Component Name", "Release", "Toxic from Date", "Number of IT Assets"]
-]
-
-flt_local_df["Number of IT Assets"] = flt_local_df["Number of IT Assets"].fillna(0)
-flt_local_df["Toxic from Date"] = pd.to_datetime(flt_local_df["Toxic from Date"], errors='coerce')
-
-# Create full list of component-detail triplets
-component_details = flt_local_df[["IT Component Name", "Release", "Toxic from Date"]].drop_duplicates()
-
-# Create pivot-style mapping for each OE
-pivot_dict = {}
-for oe in all_oe_list:
-    row_data = {}
-    for _, row in component_details.iterrows():
-        key = (row["IT Component Name"], row["Release"], row["Toxic from Date"])
-        val = flt_local_df[
-            (flt_local_df["Allianz OE Name"] == oe) &
-            (flt_local_df["IT Component Name"] == key[0]) &
-            (flt_local_df["Release"] == key[1]) &
-            (flt_local_df["Toxic from Date"] == key[2])
-        ]["Number of IT Assets"].sum()
-        row_data[key] = val
-    pivot_dict[oe] = row_data
-
-# === Step 4: Build Excel workbook ===
-wb = Workbook()
-ws = wb.active
-ws.title = "FLT Local Details"
-
-# === Multi-row header ===
-# === Title Row (A1:C1) ===
-ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=3)
-ws.cell(row=1, column=1, value="Number of IT Assets")
-ws.cell(row=6, column=1, value="Current Status")
-ws.cell(row=6, column=2, value="IT Component Type")
-ws.cell(row=6, column=3, value="Allianz OE Name")
-ws.cell(row=3, column=4, value="IT Component Name")  		
-ws.cell(row=3, column=5, value="Release")
-ws.cell(row=3, column=6, value="Toxic from Date")
-
-
-start_col = 4
-component_keys = sorted(
-    component_details.itertuples(index=False),
-    key=lambda x: (x[0], str(x[1]), str(x[2]))
-)   
-
-for idx, key in enumerate(component_keys):
-    col = start_col + idx
-    comp_name, release, toxic_date = key
-    ws.cell(row=4, column=col, value=comp_name)
-    ws.cell(row=5, column=col, value=release)
-    ws.cell(row=6, column=col, value=toxic_date.strftime("%m/%d/%Y") if pd.notna(toxic_date) else "")
-
-# === Component Detail Header Loop ===
-for idx, key in enumerate(component_keys):
-    col = start_col + idx
-    comp_name, release, toxic_date = key
-    ws.cell(row=4, column=col, value=comp_name)
-    ws.cell(row=5, column=col, value=release)
-    ws.cell(row=6, column=col, value=toxic_date.strftime("%m/%d/%Y") if pd.notna(toxic_date) else "")
-
-# === Merge Row 4 cells for consecutive duplicate IT Component Names ===
-merge_start = start_col
-prev_name = component_keys[0][0]
-
-for idx, key in enumerate(component_keys[1:], start=1):
-    col = start_col + idx
-    curr_name = key[0]
-
-    if curr_name != prev_name:
-        if col - 1 > merge_start:
-            ws.merge_cells(start_row=4, start_column=merge_start, end_row=4, end_column=col - 1)
-        merge_start = col
-    prev_name = curr_name
-
-# Merge the final group (if any)
-last_col = start_col + len(component_keys) - 1
-if last_col > merge_start:
-    ws.merge_cells(start_row=4, start_column=merge_start, end_row=4, end_column=last_col)
-
-
-# Add headers for total columns
-ws.cell(row=3, column=start_col + len(component_keys), value="Grand Total")
-ws.cell(row=3, column=start_col + len(component_keys) + 1, value="Grand Total 2025")
-ws.cell(row=3, column=start_col + len(component_keys) + 1).fill = openpyxl.styles.PatternFill(
-    start_color="E2EFDA", end_color="E2EFDA", fill_type="solid"
+from date_buckets import flt_buckets
+from detail_sheet import (
+    FIRST_DATA_ROW, FLT_KEY_COLS, START_COL, bucket_header, bucket_mask, component_name_runs, component_text_lengths,
+    date_text, pivot_totals,
 )
-
-
-# === Data rows ===
-totals_by_col = [0] * len(component_keys)
-totals_2025_by_row = []
-grand_totals_by_row = []
-
-for i, oe in enumerate(all_oe_list, start=7):
-    ws.cell(row=i, column=1, value="Forward Looking Toxic")
-    ws.cell(row=i, column=2, value="Regional/Local")
-    ws.cell(row=i, column=3, value=oe)
-    
-    row_sum = 0
-    row_sum_2025 = 0
-    for j, key in enumerate(component_keys):
-        val = pivot_dict[oe].get(key, 0)
-        col = start_col + j
-        ws.cell(row=i, column=col, value=val)
-        row_sum += val
-        totals_by_col[j] += val
-
-        if pd.notna(key[2]) and key[2].year == 2025:
-            row_sum_2025 += val
-
-    grand_totals_by_row.append(row_sum)
-    totals_2025_by_row.append(row_sum_2025)
-    ws.cell(row=i, column=start_col + len(component_keys), value=row_sum)
-    ws.cell(row=i, column=start_col + len(component_keys) + 1, value=row_sum_2025)
-
-# === Total row ===
-total_row_index = 6 + len(all_oe_list)
-ws.cell(row=total_row_index, column=1, value="Grand Total")
-ws.cell(row=total_row_index, column=2, value="")
-ws.cell(row=total_row_index, column=3, value="")
-
-# Fill in totals by column
-for j, total in enumerate(totals_by_col):
-    col = start_col + j
-    ws.cell(row=total_row_index, column=col, value=total)
-
-# Grand column total & 2025 column total
-ws.cell(row=total_row_index, column=start_col + len(component_keys), value=sum(grand_totals_by_row))
-ws.cell(row=total_row_index, column=start_col + len(component_keys) + 1, value=sum(totals_2025_by_row))
-
-
-
-# Bold all numbers in total row
-for col in range(4, start_col + len(component_keys) + 2):
-    ws.cell(row=total_row_index, column=col).font = Font(bold=True)
-
-# Bold "Grand Total 2025" label
-ws.cell(row=3, column=start_col + len(component_keys) + 1).font = Font(bold=True)
-
-
-for col in ws.columns:
-    max_length = 0
-    col_letter = get_column_letter(col[0].column)
-    for cell in col:
-        try:
-            if cell.value:
-                max_length = max(max_length, len(str(cell.value)))
-        except:
-            pass
-    ws.column_dimensions[col_letter].width = max_length + 2  # add padding
-
-ws.freeze_panes = "D7"  # freeze everything left of column D and above row 7
-
-thin_border = Border(
-    left=Side(style='thin'),
-    right=Side(style='thin'),
-    top=Side(style='thin'),
-    bottom=Side(style='thin')
-)
-
-# Apply border to every non-empty cell
-for row in ws.iter_rows(
-    min_row=3, 
-    max_row=total_row_index,
-    min_col=1,
-    max_col=start_col + len(component_keys) + 1
-):
-    for cell in row:
-        if cell.value is not None:
-            cell.border = thin_border
-
-# === Save file ===
-wb.save("FLT_Local_Details_Final.xlsx")
-# Auto-adjust column widths based on max content in each column
+from pivot_engine import build_pivot, cube_slice
+from run_profile import frame_shape, record, stage
+from report_workbook import new_report_workbook
+from sheet_layout import region
+from sheet_writer import array_text_lengths, fit_widths, text_length, write_sheet
+
+
+def local_flt_pivot_rows(pivot, buckets=()):
+    """Yield the plain FLT Local pivot's values row by row, from the title down to the Grand Total row."""
+    component_keys = list(pivot.columns)
+    n = len(component_keys)
+    run_starts = {first for first, _ in component_name_runs(component_keys)}
+    row_sums, bucket_sums, col_totals = pivot_totals(pivot, bucket_mask(component_keys, buckets))
+
+    yield ["Number of IT Assets"]
+    yield []
+
+    # === Row 3: labels + total headers ===
+    row = [None] * (START_COL - 1 + max(n, 3))
+    for col, label in enumerate(["IT Component Name", "Release", "Toxic from Date"], start=START_COL):
+        row[col - 1] = label
+    yield row[:START_COL - 1 + n] + ["Grand Total"] + [bucket_header(bucket) for bucket in buckets]
+
+    # === Rows 4-6: component name (merged per run), release, toxic from date ===
+    yield [None] * 3 + [
+        key[0] if START_COL + idx in run_starts else None
+        for idx, key in enumerate(component_keys)
+    ]
+    yield [None] * 3 + [key[1] for key in component_keys]
+    yield ["Current Status", "IT Component Type", "Allianz OE Name"] + [date_text(key) for key in component_keys]
+
+    # === Data rows ===
+    rows = zip(pivot.index, pivot.to_numpy().tolist(), row_sums.tolist(), bucket_sums.tolist())
+    for oe, row_values, row_sum, row_bucket_sums in rows:
+        yield [FLT_STATUS, LOCAL_TYPE, oe] + row_values + [row_sum] + row_bucket_sums
+
+    # === Total row ===
+    yield ["Grand Total", "", ""] + col_totals.tolist() + [row_sums.sum().item()] + bucket_sums.sum(axis=0).tolist()
+
+
+def local_flt_pivot_regions(pivot, buckets=()):
+    """Thin box around every non-empty cell from row 3 to the total row, bold totals."""
+    gt_col = START_COL + len(pivot.columns)
+    last_col = gt_col + len(buckets)
+    total_row = FIRST_DATA_ROW + len(pivot.index)
+    return [
+        region(range(3, total_row + 1), range(1, last_col + 1), "box_border", non_empty=True),
+        region(range(3, 4), range(gt_col + 1, last_col + 1), "green_2025", "bold"),
+        region(range(total_row, total_row + 1), range(START_COL, last_col + 1), "bold"),
+    ]
+
+
+def local_flt_pivot_widths(pivot, buckets=()):
+    """Column widths from the pivot and its totals; the A1:C1 title spreads over A-C."""
+    component_keys = list(pivot.columns)
+    n = len(component_keys)
+    row_sums, bucket_sums, _ = pivot_totals(pivot, bucket_mask(component_keys, buckets))
+
+    lengths, spans = component_text_lengths(pivot)
+    lengths[1] = text_length(["Current Status", FLT_STATUS, "Grand Total"])
+    lengths[2] = text_length(["IT Component Type", LOCAL_TYPE])
+    lengths[3] = text_length(["Allianz OE Name"] + list(pivot.index))
+    for col, label in enumerate(["IT Component Name", "Release", "Toxic from Date"], start=START_COL):
+        lengths[col] = max(lengths.get(col, 0), len(label))
+    total_columns = [("Grand Total", row_sums)]
+    total_columns += [(bucket_header(bucket), bucket_sums[:, idx]) for idx, bucket in enumerate(buckets)]
+    for col, (header, sums) in enumerate(total_columns, start=START_COL + n):
+        lengths[col] = max(
+            len(header),
+            text_length([sums.sum().item()]),
+            int(array_text_lengths(sums[:, None])[0]),
+        )
+    spans.append((1, 3, len("Number of IT Assets")))
+    return fit_widths(lengths, spans)
+
+
+def generate_local_flt_pivot(wb, data, buckets=None):
+    # === Step 1: Take this sheet's cells from the shared cube ===
+    buckets = flt_buckets() if buckets is None else buckets
+    flt_local_df = cube_slice(data, FLT_STATUS, LOCAL_TYPE)
+
+    # === Step 2: OE x component-detail matrix, all OEs present ===
+    with stage("pivot"):
+        pivot = build_pivot(flt_local_df, ALL_OE_LIST, FLT_KEY_COLS)
+        record(**frame_shape(pivot))
+    with stage("widths"):
+        widths = local_flt_pivot_widths(pivot, buckets)
+
+    # === Step 3: Write the sheet top to bottom ===
+    merges = ["A1:C1"] + [
+        f"{get_column_letter(first)}4:{get_column_letter(last)}4"
+        for first, last in component_name_runs(list(pivot.columns)) if last > first
+    ]
+    write_sheet(
+        wb, "FLT Local Details", local_flt_pivot_rows(pivot, buckets),
+        regions=local_flt_pivot_regions(pivot, buckets),
+        merges=merges,
+        freeze_panes="D7",  # freeze everything left of column D and above row 7
+        widths=widths,
+    )
+
+
+if __name__ == "__main__":
+    wb = new_report_workbook()
+    generate_local_flt_pivot(wb, load_archer_cube())
+    wb.save("FLT_Local_Pivot_Final.xlsx")
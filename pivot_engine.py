@@ -0,0 +1,116 @@
+import hashlib
+
+import pandas as pd
+
+
+OE_COL = "Allianz OE Name"
+VALUE_COL = "Number of IT Assets"
+
+
+def component_sort_key(key):
+    # Same ordering the detail sheets always used: name first, then the rest as text
+    return tuple(str(part) for part in key)
+
+
+def build_pivot(df, oe_list, key_cols, value_col=VALUE_COL, oe_col=OE_COL):
+    """Sum `value_col` into an OE x component-key matrix in one grouped pass.
+
+    Rows follow `oe_list` (OEs without data are filled with 0), columns are the
+    distinct `key_cols` tuples of `df` sorted with `component_sort_key`.
+    """
+    # Number every component tuple once; NaN/NaT parts stay a valid key
+    grouper = df.groupby(key_cols, dropna=False, sort=False, observed=True)
+    group_keys = list(grouper.size().index)
+    order = sorted(range(len(group_keys)), key=lambda g: component_sort_key(group_keys[g]))
+    column_of_group = {group: column for column, group in enumerate(order)}
+
+    matrix = (
+        df.assign(_column=grouper.ngroup().map(column_of_group))
+        .groupby([oe_col, "_column"], observed=True)[value_col]
+        .sum()
+        .unstack(fill_value=0)
+        .reindex(index=oe_list, columns=range(len(order)), fill_value=0)
+    )
+    matrix.index.name = oe_col
+    matrix.columns = pd.Index([group_keys[g] for g in order], tupleize_cols=False)
+    return matrix
+
+
+STATUS_COL = "Current Status"
+TYPE_COL = "IT Component Type"
+CUBE_DIMS = [STATUS_COL, TYPE_COL, OE_COL, "IT Component Name", "Release", "Toxic from Date"]
+
+
+def aggregate_cells(df):
+    """Sum assets over status x type x OE x component x release x toxic date in one pass.
+
+    Summing the cells of several frames again gives the cells of their
+    concatenation, which is what the chunked loader relies on.
+    """
+    return df.groupby(CUBE_DIMS, dropna=False, sort=False, observed=True)[VALUE_COL].sum().reset_index()
+
+
+def split_cube(cells):
+    """{(status, component type): cells} of aggregated cells."""
+    return {
+        key: part.reset_index(drop=True)
+        for key, part in cells.groupby([STATUS_COL, TYPE_COL], sort=False, observed=True)
+    }
+
+
+def build_cube(df):
+    """Aggregate `df` into cells and split them by status and component type.
+
+    Returns {(status, component type): cells}; every report sheet is then a
+    dict lookup plus a small pivot over already-aggregated cells.
+    """
+    return split_cube(aggregate_cells(df))
+
+
+def _empty_cells(cube):
+    """No cells, with the cube's column dtypes (the extract's when the cube is empty too)."""
+    if cube:
+        return next(iter(cube.values())).iloc[:0]
+    empty = pd.DataFrame(columns=CUBE_DIMS + [VALUE_COL])
+    return empty.astype({"Toxic from Date": "datetime64[ns]", VALUE_COL: "float64"})
+
+
+def cube_slice(cube, status, component_type=None):
+    """Cells for one status, optionally narrowed to one IT Component Type."""
+    parts = [
+        part for (part_status, part_type), part in cube.items()
+        if part_status == status and component_type in (None, part_type)
+    ]
+    if not parts:
+        return _empty_cells(cube)
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts, ignore_index=True)
+
+
+def status_summary(cube, status):
+    """OE x IT Component Type totals for one status (the FLT / Toxic pvt sheets)."""
+    return (
+        cube_slice(cube, status)
+        .groupby([OE_COL, TYPE_COL], observed=True)[VALUE_COL]
+        .sum()
+        .unstack(fill_value=0)
+    )
+
+
+def slice_fingerprint(cube, status, component_type=None, key_cols=()):
+    """SHA-256 of what one sheet reads: a status/type slice summed per OE and `key_cols`.
+
+    Independent of row order and category dictionaries, so an unchanged slice
+    of a new extract gets the same fingerprint.
+    """
+    dims = [OE_COL, *key_cols]
+    summed = (
+        cube_slice(cube, status, component_type)
+        .groupby(dims, dropna=False, sort=False, observed=True)[VALUE_COL]
+        .sum()
+        .reset_index()
+    )
+    summed = summed.astype({col: str for col in dims}).sort_values(dims, kind="stable")
+    hashes = pd.util.hash_pandas_object(summed, index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
@@ -0,0 +1,75 @@
+import numpy as np
+
+from archer_data import GROUP_TYPE, LOCAL_TYPE
+from pivot_engine import status_summary
+from run_profile import frame_shape, record, stage
+from sheet_layout import region
+from sheet_writer import array_text_lengths, fit_widths, text_length, write_sheet
+
+
+TITLE_ROW = 6  # "Sum of Number of IT"; headers follow on row 7
+COLUMNS = ["Current Status", "Allianz OE Name", GROUP_TYPE, LOCAL_TYPE, "Grand Total"]
+
+
+def pvt_rows(summary, status):
+    """Yield the pvt sheet's values row by row: title row 6, headers row 7, OEs, Grand Total."""
+    for _ in range(5):
+        yield []
+    yield ["Sum of Number of IT"]
+    yield COLUMNS
+
+    totals = [0, 0, 0]
+    for oe, group, local in zip(summary.index, summary[GROUP_TYPE].tolist(), summary[LOCAL_TYPE].tolist()):
+        row_values = [group, local, group + local]
+        totals = [total + value for total, value in zip(totals, row_values)]
+        yield [status, oe] + row_values
+
+    yield ["Grand Total", ""] + totals
+
+
+def pvt_regions(summary):
+    """Style regions: title row, body (headers + OEs), Grand Total row."""
+    total_row = range(TITLE_ROW + 2 + len(summary), TITLE_ROW + 3 + len(summary))
+    body = range(TITLE_ROW + 1, total_row.start)
+    label_cols, number_cols = range(1, 3), range(3, 6)
+    return [
+        region(range(TITLE_ROW, TITLE_ROW + 1), label_cols, "box_border"),
+        region(range(TITLE_ROW, TITLE_ROW + 1), range(3, 5), "top_bottom_border"),
+        region(range(TITLE_ROW, TITLE_ROW + 1), range(5, 6), "top_bottom_right_border"),
+        region(body, range(1, 6), "side_border"),
+        region(range(body.start, total_row.stop), number_cols, "center"),
+        region(total_row, range(1, 6), "bold", "box_border"),
+        region(total_row, range(3, 5), "top_bottom_border"),
+    ]
+
+
+def pvt_widths(summary, status):
+    """Column widths of the pvt sheet, from the summary and its totals."""
+    values = np.column_stack([summary[GROUP_TYPE], summary[LOCAL_TYPE], summary[GROUP_TYPE] + summary[LOCAL_TYPE]])
+    value_lengths = np.maximum(
+        array_text_lengths(values),
+        array_text_lengths(values.sum(axis=0, keepdims=True)),
+    )
+    lengths = {
+        1: text_length(["Sum of Number of IT", COLUMNS[0], status, "Grand Total"]),
+        2: text_length([COLUMNS[1]] + list(summary.index)),
+    }
+    for col, (header, length) in enumerate(zip(COLUMNS[2:], value_lengths), start=3):
+        lengths[col] = max(len(header), int(length))
+    return fit_widths(lengths, padding=3)
+
+
+def generate_status_pvt_sheet(wb, data, title, status):
+    """OE x IT Component Type totals for one status of the cube `data`."""
+    with stage("pivot"):
+        summary = status_summary(data, status).reindex(columns=[GROUP_TYPE, LOCAL_TYPE], fill_value=0)
+        record(**frame_shape(summary))
+    with stage("widths"):
+        widths = pvt_widths(summary, status)
+
+    write_sheet(
+        wb, title, pvt_rows(summary, status),
+        regions=pvt_regions(summary),
+        widths=widths,
+        show_grid_lines=False,
+    )
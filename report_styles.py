@@ -0,0 +1,44 @@
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+
+
+thin = Side(style="thin")
+
+
+def _solid(color):
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+# Building blocks of every report style; a cell's style is a combination of these
+STYLE_PARTS = {
+    "side_border": {"border": Border(left=thin, right=thin)},
+    "top_bottom_border": {"border": Border(top=thin, bottom=thin)},
+    "top_bottom_right_border": {"border": Border(top=thin, bottom=thin, right=thin)},
+    "box_border": {"border": Border(top=thin, bottom=thin, left=thin, right=thin)},
+    "lilac_total": {"fill": _solid("E4DFEC")},
+    "green_2025": {"fill": _solid("E2EFDA")},
+    "green_header": {"fill": _solid("EBF1DE")},
+    "bold": {"font": Font(bold=True)},
+    "center": {"alignment": Alignment(horizontal="center", vertical="center")},
+}
+
+STYLE_PREFIX = "report "
+
+
+def style_name(parts):
+    return STYLE_PREFIX + "+".join(parts)
+
+
+def register_style(wb, parts):
+    """Name of the named style combining `parts`, added to `wb` on first use.
+
+    Cells then take the style by name, so fonts/fills/borders exist once per
+    workbook instead of once per cell, and the saved stylesheet stays small.
+    """
+    name = style_name(parts)
+    if name in wb.named_styles:
+        return name
+    attrs = {}
+    for part in parts:
+        attrs.update(STYLE_PARTS[part])
+    wb.add_named_style(NamedStyle(name=name, **attrs))
+    return name
@@ -0,0 +1,26 @@
+from openpyxl import Workbook
+
+
+def new_report_workbook(streaming=False):
+    """Empty workbook for the report sheets (without openpyxl's default "Sheet").
+
+    With `streaming` the workbook is write-only: sheets must be written with
+    sheet_writer.write_sheet and rows are flushed as they are produced.
+    """
+    if streaming:
+        return Workbook(write_only=True)
+    wb = Workbook()
+    del wb[wb.active.title]
+    return wb
+
+
+def replace_sheet(wb, title):
+    """Create sheet `title`, replacing any existing sheet with that name in place.
+
+    Excel sheet names are case-insensitive, so "FLT pvt" also replaces "flt PVT".
+    """
+    for index, existing in enumerate(wb.sheetnames):
+        if existing.lower() == title.lower():
+            del wb[existing]
+            return wb.create_sheet(title, index)
+    return wb.create_sheet(title)
@@ -1,4 +1,19 @@
-from openpyxl import Workbook, load_workbook
+import argparse
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from openpyxl import load_workbook
+from archer_data import ARCHER_FILE, ARCHER_SHEET, FLT_STATUS, GROUP_TYPE, LOCAL_TYPE, TOXIC_STATUS, load_archer_cube
+from date_buckets import BUCKETS_ENV, DEFAULT_BUCKETS, flt_buckets, parse_buckets
+from detail_sheet import FLT_KEY_COLS, TOXIC_KEY_COLS
+from extract_cache import sheet_unchanged
+from pivot_engine import TYPE_COL, slice_fingerprint
+from report_workbook import new_report_workbook
+from run_profile import add_profile_argument, parse_profiled_args, record, stage
+from sheet_cache import cached_packages, store_packages
+from xlsx_package import combine_packages, render_package, splice_packages, splice_report_sheets
 from flt_pvt import generate_flt_pvt_sheet
 from toxic_pvt import generate_toxic_pvt_sheet
 from Group_FLT_Details import generate_group_flt_details
@@ -7,23 +22,167 @@ from Local_FLT_Details import generate_local_flt_details
 from Local_Toxic_Details import generate_local_toxic_details
 
 OUTPUT_FILE = "8 July 2025 Archer Toxic sharing.xlsx"
+# Write-only workbooks cannot be loaded and appended to, so streamed runs get their own file
+STREAMING_OUTPUT_FILE = "Archer Toxic reports.xlsx"
+
+# What each sheet reads from the cube: status, component type (None: all) and the
+# columns it breaks the assets down by besides the OE. In sheet order.
+REPORT_INPUTS = {
+    generate_flt_pvt_sheet: (FLT_STATUS, None, [TYPE_COL]),
+    generate_toxic_pvt_sheet: (TOXIC_STATUS, None, [TYPE_COL]),
+    generate_group_flt_details: (FLT_STATUS, GROUP_TYPE, FLT_KEY_COLS),
+    generate_group_toxic_details: (TOXIC_STATUS, GROUP_TYPE, TOXIC_KEY_COLS),
+    generate_local_flt_details: (FLT_STATUS, LOCAL_TYPE, FLT_KEY_COLS),
+    generate_local_toxic_details: (TOXIC_STATUS, LOCAL_TYPE, TOXIC_KEY_COLS),
+}
+REPORT_GENERATORS = list(REPORT_INPUTS)
+
+
+def render_report(generate, data):
+    """Run one generator into its own write-only workbook and return the xlsx bytes.
+
+    Top-level so worker processes can pickle it; the sheets are merged back
+    into one workbook by xlsx_package.
+    """
+    wb = new_report_workbook(streaming=True)
+    generate(wb, data)
+    return render_package(wb)
+
+
+def render_reports(generators, data, jobs=1):
+    """Rendered packages of `generators`, built `jobs` at a time, in generator order."""
+    if jobs <= 1:
+        return [render_report(generate, data) for generate in generators]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(render_report, generators, [data] * len(generators)))
+
+
+def report_fingerprint(generate, data):
+    """Fingerprint of the cube slice `generate` reads (see REPORT_INPUTS)."""
+    status, component_type, key_cols = REPORT_INPUTS[generate]
+    fingerprint = slice_fingerprint(data, status, component_type, key_cols)
+    if "Toxic from Date" in key_cols:
+        # Sheets keyed by date also get a total column per date bucket
+        fingerprint = hashlib.sha256((fingerprint + repr(flt_buckets())).encode("utf-8")).hexdigest()
+    return fingerprint
+
+
+def keeping_extract_cache(output_file):
+    """Saving the reports into the Archer extract itself leaves its data sheet (and its cached parse) valid."""
+    if os.path.abspath(output_file) == os.path.abspath(ARCHER_FILE):
+        return sheet_unchanged(ARCHER_FILE, ARCHER_SHEET)
+    return nullcontext()
+
+
+def main(streaming=False, splice=False, jobs=1, chunk_rows=None, incremental=False):
+    if jobs > 1 or incremental:
+        return main_packages(streaming, jobs, chunk_rows, incremental)
+    with stage("run_all_reports", streaming=streaming, splice=splice):
+        with stage("open_workbook"):
+            if splice:
+                # Only the report sheets are built; they are put into OUTPUT_FILE's package on save
+                wb = new_report_workbook(streaming=True)
+                output_file = OUTPUT_FILE
+            elif streaming:
+                # Report sheets only, rows flushed to disk as each sheet is generated
+                wb = new_report_workbook(streaming=True)
+                output_file = STREAMING_OUTPUT_FILE
+            else:
+                output_file = OUTPUT_FILE
+                try:
+                    wb = load_workbook(output_file)
+                except FileNotFoundError:
+                    wb = new_report_workbook()
+
+        # Parse the Archer extract and aggregate it once; every generator slices this cube
+        with stage("load_archer_cube"):
+            data = load_archer_cube(chunk_rows=chunk_rows)
+
+        # Every generator adds (or replaces) its sheet in the same workbook
+        for generate in REPORT_GENERATORS:
+            with stage(generate.__name__):
+                generate(wb, data)
+
+        # Save once at the end
+        with stage("save", output=output_file), keeping_extract_cache(output_file):
+            if splice and os.path.exists(output_file):
+                splice_report_sheets(output_file, wb)
+            else:
+                wb.save(output_file)
+    print("All reports generated successfully!")
+
+
+def main_packages(streaming, jobs=1, chunk_rows=None, incremental=False):
+    """Render every sheet as its own package, then merge them into one workbook.
+
+    With `jobs` > 1 the sheets are rendered in worker processes. With
+    `incremental` a sheet whose input slice has the same fingerprint as on the
+    last run is not generated at all; its previously rendered package is
+    reused (see sheet_cache). The merged sheets are spliced into OUTPUT_FILE
+    when it exists (as --splice); streamed runs and a missing OUTPUT_FILE get
+    a workbook of the report sheets only.
+    """
+    output_file = STREAMING_OUTPUT_FILE if streaming else OUTPUT_FILE
+    with stage("run_all_reports", streaming=streaming, jobs=jobs, incremental=incremental):
+        with stage("load_archer_cube"):
+            data = load_archer_cube(chunk_rows=chunk_rows)
+
+        packages = {}
+        if incremental:
+            with stage("fingerprints"):
+                fingerprints = {generate.__name__: report_fingerprint(generate, data) for generate in REPORT_GENERATORS}
+                packages = cached_packages(fingerprints)
+                record(reused=len(packages))
+
+        # Each worker gets a copy of the cube and sends back one small rendered package
+        stale = [generate for generate in REPORT_GENERATORS if generate.__name__ not in packages]
+        with stage("generate", jobs=jobs, sheets=len(stale)):
+            rendered = dict(zip([generate.__name__ for generate in stale], render_reports(stale, data, jobs)))
+        if incremental and rendered:
+            store_packages(rendered, fingerprints)
+        packages.update(rendered)
+
+        with stage("save", output=output_file), keeping_extract_cache(output_file):
+            reports = [packages[generate.__name__] for generate in REPORT_GENERATORS]
+            if not streaming and os.path.exists(output_file):
+                splice_packages(output_file, reports)
+            else:
+                combine_packages(reports, output_file)
+    print(f"All reports generated successfully! ({len(stale)} of {len(REPORT_GENERATORS)} sheets regenerated)")
+
 
-try:
-    wb = load_workbook(OUTPUT_FILE)
-except FileNotFoundError:
-    wb = Workbook()
-    # Remove the default sheet if present
-    if "Sheet" in wb.sheetnames:
-        del wb["Sheet"]
-
-# Call all your sheet generators
-generate_flt_pvt_sheet(wb)
-generate_toxic_pvt_sheet(wb)
-generate_group_flt_details(wb)
-generate_group_toxic_details(wb)
-generate_local_flt_details(wb)
-generate_local_toxic_details(wb)
-
-# Save once at the end
-wb.save(OUTPUT_FILE)
-print("All reports generated successfully!")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the Archer toxic report sheets.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--streaming", action="store_true",
+        help=f"write the report sheets in write-only mode to {STREAMING_OUTPUT_FILE!r}",
+    )
+    mode.add_argument(
+        "--splice", action="store_true",
+        help=f"add/replace only the report sheets inside {OUTPUT_FILE!r}, leaving its other sheets as they are",
+    )
+    add_profile_argument(parser)
+    parser.add_argument(
+        "--jobs", type=int, default=1, metavar="N",
+        help="generate the sheets in N worker processes and merge them into one workbook (default: 1, in-process)",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="regenerate only the sheets whose input slice changed since the last run, reusing the others",
+    )
+    parser.add_argument(
+        "--buckets", metavar="SPEC",
+        help=f"FLT total columns, e.g. '2025,2026Q1,next12m' (or set {BUCKETS_ENV}; default {DEFAULT_BUCKETS!r})",
+    )
+    parser.add_argument(
+        "--chunk-rows", type=int, metavar="N",
+        help="stream the Archer extract and aggregate it N rows at a time instead of loading the whole sheet",
+    )
+    args = parse_profiled_args(parser)
+    if args.buckets is not None:
+        parse_buckets(args.buckets)  # fail before any work on a bad spec
+        # Through the environment so worker processes see the same buckets
+        os.environ[BUCKETS_ENV] = args.buckets
+    main(streaming=args.streaming, splice=args.splice, jobs=args.jobs, chunk_rows=args.chunk_rows,
+         incremental=args.incremental)
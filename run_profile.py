@@ -0,0 +1,125 @@
+import atexit
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; the report just has no max RSS there
+    resource = None
+
+
+# Set to a file path to profile any report script without changing it
+PROFILE_ENV = "REPORT_PROFILE"
+
+_profile = {"path": None, "started": None, "stages": [], "stack": []}
+
+
+def profiling():
+    return _profile["path"] is not None
+
+
+def start_profiling(path):
+    """Record every `stage` from now on and write the JSON report to `path` at exit."""
+    if profiling():
+        _profile["path"] = path
+        return
+    _profile["path"] = path
+    _profile["started"] = datetime.now().isoformat(timespec="seconds")
+    # Tracing allocations slows the run noticeably, so it is only on while profiling
+    tracemalloc.start()
+    atexit.register(lambda: write_report(_profile["path"]))
+
+
+@contextmanager
+def stage(name, **counts):
+    """Time the enclosed block as a stage of the run (no-op unless profiling).
+
+    Records wall and CPU time, peak traced Python memory and any counts
+    (rows, columns, ...) given here or later through `record`. Stages nest;
+    a stage's name includes its parents, e.g. "generate_group_flt_details/pivot".
+    """
+    if not profiling():
+        yield
+        return
+
+    parent = _profile["stack"][-1] if _profile["stack"] else None
+    if parent is not None:
+        # Keep the parent's peak so far; the peak counter is reset for this stage
+        parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+
+    frame = {
+        "name": f"{parent['name']}/{name}" if parent else name,
+        "counts": dict(counts),
+        "peak": 0,
+        "wall": time.perf_counter(),
+        "cpu": time.process_time(),
+    }
+    # Reserve the stage's entry now so the report lists stages in start order
+    entry = {"stage": frame["name"], "depth": len(_profile["stack"])}
+    _profile["stages"].append(entry)
+    _profile["stack"].append(frame)
+    try:
+        yield
+    finally:
+        _profile["stack"].pop()
+        peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+        entry.update(
+            wall_s=round(time.perf_counter() - frame["wall"], 6),
+            cpu_s=round(time.process_time() - frame["cpu"], 6),
+            peak_mem_bytes=peak,
+            **frame["counts"],
+        )
+        if parent is not None:
+            parent["peak"] = max(parent["peak"], peak)
+
+
+def record(**counts):
+    """Attach counts (rows, columns, ...) to the innermost running stage."""
+    if profiling() and _profile["stack"]:
+        _profile["stack"][-1]["counts"].update(counts)
+
+
+def frame_shape(df):
+    return {"rows": int(df.shape[0]), "columns": int(df.shape[1])}
+
+
+def report():
+    max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+    return {
+        "started": _profile["started"],
+        "argv": sys.argv,
+        "max_rss_kb": max_rss_kb,
+        "stages": _profile["stages"],
+    }
+
+
+def add_profile_argument(parser):
+    """The --profile JSON_FILE option of every report CLI; see parse_profiled_args."""
+    parser.add_argument(
+        "--profile", metavar="JSON_FILE",
+        help=f"write per-stage timing/memory to JSON_FILE (or set {PROFILE_ENV}=JSON_FILE)",
+    )
+
+
+def parse_profiled_args(parser):
+    """parser.parse_args(), profiling the rest of the run if --profile was given."""
+    args = parser.parse_args()
+    if args.profile:
+        start_profiling(args.profile)
+    return args
+
+
+def write_report(path):
+    with open(path, "w") as f:
+        json.dump(report(), f, indent=2, default=str)
+
+
+if os.environ.get(PROFILE_ENV):
+    start_profiling(os.environ[PROFILE_ENV])
@@ -0,0 +1,75 @@
+import json
+import os
+
+from extract_cache import CACHE_DIR
+
+
+SHEET_CACHE_DIR = os.path.join(CACHE_DIR, "sheets")
+MANIFEST_FILE = "manifest.json"
+
+# Bump when the sheet layout/styling changes so previously rendered sheets are not reused
+SHEET_CACHE_VARIANT = "v1"
+
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _package_path(cache_dir, name, fingerprint):
+    return os.path.join(cache_dir, f"{name}-{fingerprint[:16]}.xlsx")
+
+
+def read_manifest(cache_dir=None):
+    """{sheet name: fingerprint} of the sheets rendered last time ({} if none or outdated)."""
+    path = os.path.join(cache_dir or SHEET_CACHE_DIR, MANIFEST_FILE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("variant") != SHEET_CACHE_VARIANT:
+        return {}
+    return manifest.get("sheets", {})
+
+
+def cached_packages(fingerprints, cache_dir=None):
+    """Rendered packages of the sheets whose fingerprint matches the last run's."""
+    cache_dir = cache_dir or SHEET_CACHE_DIR
+    manifest = read_manifest(cache_dir)
+    packages = {}
+    for name, fingerprint in fingerprints.items():
+        if manifest.get(name) != fingerprint:
+            continue
+        try:
+            with open(_package_path(cache_dir, name, fingerprint), "rb") as f:
+                packages[name] = f.read()
+        except OSError:
+            # Manifest entry without its package: render the sheet again
+            pass
+    return packages
+
+
+def store_packages(packages, fingerprints, cache_dir=None):
+    """Keep freshly rendered `packages` for the next run, with their fingerprints.
+
+    Package files are named after their fingerprint, so a manifest entry can
+    only ever point at the package rendered from that input. The packages a
+    sheet no longer uses are removed once the manifest is written.
+    """
+    cache_dir = cache_dir or SHEET_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = read_manifest(cache_dir)
+    for name, xlsx in packages.items():
+        _write_atomic(_package_path(cache_dir, name, fingerprints[name]), xlsx)
+        manifest[name] = fingerprints[name]
+    data = {"variant": SHEET_CACHE_VARIANT, "sheets": manifest}
+    _write_atomic(os.path.join(cache_dir, MANIFEST_FILE), json.dumps(data, indent=2).encode("utf-8"))
+
+    in_use = {os.path.basename(_package_path(cache_dir, name, fp)) for name, fp in manifest.items()}
+    for file_name in os.listdir(cache_dir):
+        name = file_name.rsplit("-", 1)[0]
+        if name in packages and file_name.endswith(".xlsx") and file_name not in in_use:
+            os.remove(os.path.join(cache_dir, file_name))
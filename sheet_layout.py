@@ -0,0 +1,62 @@
+from collections import namedtuple
+
+from report_styles import STYLE_PARTS
+
+
+# A block of cells and the report_styles parts it contributes. `rows`/`cols` are
+# ranges (or any container) of 1-based numbers; with `non_empty` only cells that
+# hold a value (anything but None) get the parts.
+Region = namedtuple("Region", "rows cols parts non_empty")
+
+# A cell value plus the style parts it ends up with
+Styled = namedtuple("Styled", "value style")
+
+_PART_ORDER = {part: i for i, part in enumerate(STYLE_PARTS)}
+
+
+def region(rows, cols, *parts, non_empty=False):
+    return Region(rows, cols, parts, non_empty)
+
+
+def compose(parts):
+    """Final parts of a cell: per attribute (border, fill, font, alignment) the last part wins."""
+    by_attr = {}
+    for part in parts:
+        for attr in STYLE_PARTS[part]:
+            by_attr[attr] = part
+    return tuple(sorted(set(by_attr.values()), key=_PART_ORDER.get))
+
+
+def _band_styles(regions, width):
+    """[(style if empty, style if it holds a value)] per column for one set of regions."""
+    styles = []
+    for col in range(1, width + 1):
+        covering = [r for r in regions if col in r.cols]
+        empty = compose(part for r in covering if not r.non_empty for part in r.parts)
+        filled = compose(part for r in covering for part in r.parts)
+        styles.append((empty, filled))
+    return styles
+
+
+def layout_rows(rows, regions):
+    """Yield every row of plain values as a list of `Styled` cells.
+
+    Each cell's style is worked out once from all the regions covering it
+    (later regions override earlier ones per attribute). Rows sharing the same
+    covering regions - the whole data body, typically - share one computation.
+    """
+    region_width = [max(r.cols, default=0) for r in regions]
+    bands = {}
+    for row_idx, values in enumerate(rows, start=1):
+        active = tuple(i for i, r in enumerate(regions) if row_idx in r.rows)
+        if active not in bands:
+            width = max((region_width[i] for i in active), default=0)
+            bands[active] = _band_styles([regions[i] for i in active], width)
+        styles = bands[active]
+
+        values = list(values)
+        values += [None] * (len(styles) - len(values))
+        yield [
+            Styled(value, styles[col][value is not None] if col < len(styles) else ())
+            for col, value in enumerate(values)
+        ]
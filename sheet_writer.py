@@ -0,0 +1,110 @@
+import numpy as np
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+from report_styles import register_style
+from report_workbook import replace_sheet
+from run_profile import record, stage
+from sheet_layout import layout_rows
+
+
+def text_length(values):
+    """Longest str() of the non-empty values (0 if there are none)."""
+    return max((len(str(value)) for value in values if value), default=0)
+
+
+def array_text_lengths(matrix, zero_text=None):
+    """Longest str() per column of a 2-D numeric array, computed on the array itself.
+
+    Zeros count as `zero_text` when the sheet shows them as such (e.g. "-"),
+    otherwise as empty, like any other falsy value.
+    """
+    matrix = np.asarray(matrix)
+    if matrix.shape[0] == 0:
+        return np.zeros(matrix.shape[1], dtype=int)
+    lengths = np.char.str_len(matrix.astype(str))
+    lengths[matrix == 0] = len(zero_text) if zero_text else 0
+    return lengths.max(axis=0)
+
+
+def fit_widths(lengths, spans=(), padding=2):
+    """{column: width} from per-column text lengths plus padding.
+
+    `spans` are (first column, last column, text length) of merged cells; their
+    text only widens the merged columns, evenly, if it does not already fit
+    across them.
+    """
+    widths = {col: length + padding for col, length in lengths.items()}
+    for first, last, length in spans:
+        cols = range(first, last + 1)
+        missing = length + padding - sum(widths.get(col, padding) for col in cols)
+        if missing <= 0:
+            continue
+        extra, remainder = divmod(missing, len(cols))
+        for i, col in enumerate(cols):
+            widths[col] = widths.get(col, padding) + extra + (1 if i < remainder else 0)
+    return widths
+
+
+def _write_only_cell(ws, item, style_of):
+    if not item.style:
+        return item.value
+    cell = WriteOnlyCell(ws, value=item.value)
+    cell.style = style_of(item.style)
+    return cell
+
+
+def write_sheet(wb, title, rows, regions=(), merges=(), freeze_panes=None, widths=None,
+                show_grid_lines=True):
+    """Write `rows` (starting at row 1) into sheet `title` of `wb`.
+
+    Each row is a list of plain values (None for empty). Styles come from the
+    declared `regions` (see sheet_layout) and are written with the value, once
+    per cell. Merges, freeze panes, widths and grid lines are declared before
+    the first row, so on a write-only workbook (new_report_workbook(streaming=True))
+    rows go straight to the output stream and `rows` can be a generator.
+    """
+    with stage("write_sheet", sheet=title, merges=len(merges)):
+        ws = replace_sheet(wb, title)
+        n_rows, n_cols = _write_rows(wb, ws, rows, regions, merges, freeze_panes, widths, show_grid_lines)
+        record(rows=n_rows, columns=n_cols)
+    return ws
+
+
+def _write_rows(wb, ws, rows, regions, merges, freeze_panes, widths, show_grid_lines):
+    # Each distinct combination of style parts is looked up/registered once per sheet
+    names = {}
+
+    def style_of(parts):
+        if parts not in names:
+            names[parts] = register_style(wb, parts)
+        return names[parts]
+
+    ws.sheet_view.showGridLines = show_grid_lines
+    if freeze_panes:
+        ws.freeze_panes = freeze_panes
+    for col, width in (widths or {}).items():
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+    n_rows = n_cols = 0
+    if wb.write_only:
+        for cell_range in merges:
+            ws.merged_cells.add(cell_range)
+        for n_rows, row in enumerate(layout_rows(rows, regions), start=1):
+            ws.append([_write_only_cell(ws, item, style_of) for item in row])
+            n_cols = max(n_cols, len(row))
+        return n_rows, n_cols
+
+    for cell_range in merges:
+        ws.merge_cells(cell_range)
+    for n_rows, row in enumerate(layout_rows(rows, regions), start=1):
+        n_cols = max(n_cols, len(row))
+        for col_idx, (value, parts) in enumerate(row, start=1):
+            if value is None and not parts:
+                continue
+            cell = ws.cell(row=n_rows, column=col_idx)
+            if value is not None:
+                cell.value = value
+            if parts:
+                cell.style = style_of(parts)
+    return n_rows, n_cols
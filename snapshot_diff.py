@@ -0,0 +1,118 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from archer_data import ARCHER_SHEET, FLT_STATUS, TOXIC_STATUS, load_archer_cube
+from date_buckets import write_tables
+from pivot_engine import OE_COL, STATUS_COL, TYPE_COL, VALUE_COL, cube_slice
+from run_profile import add_profile_argument, parse_profiled_args, record, stage
+
+
+DIFF_FILE = "Archer month-over-month changes.xlsx"
+DIFF_KEYS = [OE_COL, "IT Component Name", "Release", TYPE_COL]
+TRACKED_STATUSES = [FLT_STATUS, TOXIC_STATUS]
+
+NEW = "New"
+RESOLVED = "Resolved"
+FLT_TO_TOXIC = "FLT to Toxic"
+COUNT_CHANGED = "Count changed"
+
+PREVIOUS = " (previous)"
+CURRENT = " (current)"
+
+
+def snapshot_assets(file_path, sheet_name=ARCHER_SHEET, chunk_rows=None):
+    """FLT and Toxic assets per DIFF_KEYS of one extract, one column per status."""
+    cube = load_archer_cube(file_path, sheet_name, chunk_rows=chunk_rows)
+    cells = pd.concat([cube_slice(cube, status) for status in TRACKED_STATUSES], ignore_index=True)
+    # Each extract has its own category dictionaries; join on the plain text
+    cells = cells.astype({col: "str" for col in DIFF_KEYS + [STATUS_COL]})
+    assets = (
+        cells.groupby(DIFF_KEYS + [STATUS_COL], dropna=False)[VALUE_COL]
+        .sum()
+        .unstack(STATUS_COL, fill_value=0)
+        .reindex(columns=TRACKED_STATUSES, fill_value=0)
+    )
+    assets.columns.name = None
+    return assets.reset_index()
+
+
+def diff_snapshots(previous, current):
+    """Entries that are new, resolved, moved from FLT to Toxic or changed in count.
+
+    `previous` and `current` come from snapshot_assets. They are hash-joined
+    on DIFF_KEYS (one outer merge), so the cost grows with the number of
+    entries and not with their product.
+    """
+    merged = previous.merge(current, on=DIFF_KEYS, how="outer", suffixes=(PREVIOUS, CURRENT))
+    counts = [status + suffix for suffix in (PREVIOUS, CURRENT) for status in TRACKED_STATUSES]
+    merged[counts] = merged[counts].fillna(0)
+
+    prev_flt, prev_toxic, curr_flt, curr_toxic = (merged[col] for col in counts)
+    prev_total, curr_total = prev_flt + prev_toxic, curr_flt + curr_toxic
+    change = np.select(
+        [
+            (prev_total == 0) & (curr_total > 0),
+            (prev_total > 0) & (curr_total == 0),
+            (prev_flt > 0) & (prev_toxic == 0) & (curr_toxic > 0),
+            (prev_flt != curr_flt) | (prev_toxic != curr_toxic),
+        ],
+        [NEW, RESOLVED, FLT_TO_TOXIC, COUNT_CHANGED],
+        default="",
+    )
+    merged.insert(0, "Change", change)
+    merged["Delta"] = curr_total - prev_total
+    changes = merged[merged["Change"] != ""]
+    return changes.sort_values(["Change"] + DIFF_KEYS, kind="stable").reset_index(drop=True)
+
+
+def oe_deltas(previous, current):
+    """Assets per OE x status x IT Component Type in both snapshots and their difference."""
+    def totals(assets):
+        return assets.groupby([OE_COL, TYPE_COL])[TRACKED_STATUSES].sum().stack().rename_axis(
+            [OE_COL, TYPE_COL, STATUS_COL]
+        )
+
+    deltas = pd.concat([totals(previous).rename("Previous"), totals(current).rename("Current")], axis=1)
+    deltas = deltas.fillna(0)
+    deltas["Delta"] = deltas["Current"] - deltas["Previous"]
+    deltas = deltas.reorder_levels([OE_COL, STATUS_COL, TYPE_COL]).sort_index()
+    return deltas.reset_index()
+
+
+def write_diff(changes, deltas, path):
+    write_tables({"Changes": changes, "OE Deltas": deltas}, path)
+
+
+def compare_extracts(previous_path, current_path, output_path=DIFF_FILE, sheet_name=ARCHER_SHEET, chunk_rows=None):
+    """Write the changes between two Archer extracts to `output_path`; returns (changes, deltas)."""
+    with stage("snapshot_diff"):
+        with stage("load_previous"):
+            previous = snapshot_assets(previous_path, sheet_name, chunk_rows)
+            record(entries=len(previous))
+        with stage("load_current"):
+            current = snapshot_assets(current_path, sheet_name, chunk_rows)
+            record(entries=len(current))
+        with stage("join"):
+            changes = diff_snapshots(previous, current)
+            deltas = oe_deltas(previous, current)
+            record(changes=len(changes))
+        with stage("save", output=output_path):
+            write_diff(changes, deltas, output_path)
+    return changes, deltas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two Archer extracts (e.g. last month's and this month's).")
+    parser.add_argument("previous", help="the earlier extract")
+    parser.add_argument("current", help="the later extract")
+    parser.add_argument("--output", default=DIFF_FILE, help=f"xlsx to write (default {DIFF_FILE!r})")
+    parser.add_argument("--sheet", default=ARCHER_SHEET, help=f"sheet of both extracts (default {ARCHER_SHEET!r})")
+    parser.add_argument("--chunk-rows", type=int, metavar="N", help="stream each extract N rows at a time")
+    add_profile_argument(parser)
+    args = parse_profiled_args(parser)
+    changes, _ = compare_extracts(args.previous, args.current, args.output, args.sheet, args.chunk_rows)
+    for change, count in changes["Change"].value_counts().items():
+        print(f"{change}: {count}")
+    print(f"Written to {args.output}")
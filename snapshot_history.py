@@ -0,0 +1,123 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from archer_data import ARCHER_SHEET, load_archer_cube, snapshot_date
+from pivot_engine import OE_COL, STATUS_COL, TYPE_COL, VALUE_COL
+from run_profile import add_profile_argument, parse_profiled_args, record, stage
+
+
+HISTORY_FILE = "Toxic Remediation.csv"
+DATE_COL = "Date"
+# The Power BI measures filter on the snapshot date, status, type and YEAR of the Toxic from Date
+HISTORY_DIMS = [DATE_COL, STATUS_COL, TYPE_COL, OE_COL, "Toxic from Date"]
+HISTORY_COLUMNS = HISTORY_DIMS + [VALUE_COL]
+
+
+def dated_extracts(directory):
+    """(date, path) of every dated xlsx extract in `directory`, oldest first."""
+    extracts = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(".xlsx") or name.startswith("~$"):
+            continue
+        path = os.path.join(directory, name)
+        date = snapshot_date(path)
+        if date is None:
+            raise ValueError(f"No snapshot date in the file name {name!r} (expected e.g. '8 July 2025' or '2025-07-08')")
+        extracts.append((date, path))
+    dates = [date for date, _ in extracts]
+    duplicates = sorted({date.date().isoformat() for date in dates if dates.count(date) > 1})
+    if duplicates:
+        raise ValueError(f"More than one extract for snapshot date(s) {duplicates} in {directory!r}")
+    return sorted(extracts)
+
+
+def snapshot_aggregate(date, file_path, sheet_name=ARCHER_SHEET, chunk_rows=None):
+    """Assets per HISTORY_DIMS for one extract, stamped with its snapshot `date`."""
+    cube = load_archer_cube(file_path, sheet_name, chunk_rows=chunk_rows)
+    if not cube:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    cells = pd.concat(cube.values(), ignore_index=True)
+    aggregate = (
+        cells.groupby(HISTORY_DIMS[1:], dropna=False, sort=True, observed=True)[VALUE_COL]
+        .sum()
+        .reset_index()
+    )
+    aggregate.insert(0, DATE_COL, date)
+    # Each snapshot has its own categories; plain text concatenates cleanly across snapshots
+    return aggregate.astype({col: "str" for col in [STATUS_COL, TYPE_COL, OE_COL]})
+
+
+def build_history(directory, sheet_name=ARCHER_SHEET, jobs=None, chunk_rows=None):
+    """One date-stamped frame of the aggregates of every extract in `directory`.
+
+    Extracts are processed in parallel (`jobs` worker processes, default one
+    per CPU). Each worker goes through load_archer_cube, so its on-disk cache
+    makes rebuilding unchanged months cheap.
+    """
+    extracts = dated_extracts(directory)
+    record(snapshots=len(extracts))
+    if not extracts:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    dates, paths = zip(*extracts)
+    n = len(extracts)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        parts = list(pool.map(snapshot_aggregate, dates, paths, [sheet_name] * n, [chunk_rows] * n))
+    return pd.concat(parts, ignore_index=True)
+
+
+def read_history(path):
+    if path.lower().endswith(".parquet"):
+        return pd.read_parquet(path)
+    if path.lower().endswith(".xlsx"):
+        return pd.read_excel(path, parse_dates=[DATE_COL, "Toxic from Date"])
+    return pd.read_csv(path, parse_dates=[DATE_COL, "Toxic from Date"])
+
+
+def write_history(history, path):
+    """Save atomically as csv, parquet or xlsx, by extension."""
+    tmp_path = path + ".tmp"
+    if path.lower().endswith(".parquet"):
+        history.to_parquet(tmp_path, index=False)
+    elif path.lower().endswith(".xlsx"):
+        # ExcelWriter picks its format from the extension, so hand it the open temp file
+        with open(tmp_path, "wb") as f, pd.ExcelWriter(f, engine="openpyxl") as writer:
+            history.to_excel(writer, sheet_name="Toxic Remediation", index=False)
+    else:
+        history.to_csv(tmp_path, index=False, date_format="%Y-%m-%d")
+    os.replace(tmp_path, path)
+
+
+def update_history(directory, output_path=HISTORY_FILE, sheet_name=ARCHER_SHEET, jobs=None, chunk_rows=None):
+    """Append the snapshots of `directory` to the dataset at `output_path`.
+
+    Snapshot dates already in the dataset are replaced by the newly processed
+    extracts; all other dates are kept, so the file accumulates the history.
+    """
+    with stage("build_history", jobs=jobs):
+        history = build_history(directory, sheet_name, jobs, chunk_rows)
+    with stage("merge_history"):
+        if os.path.exists(output_path):
+            previous = read_history(output_path)
+            previous = previous[~previous[DATE_COL].isin(history[DATE_COL].unique())]
+            history = pd.concat([previous, history], ignore_index=True)
+        history = history.sort_values(HISTORY_DIMS, kind="stable", na_position="last").reset_index(drop=True)
+        record(rows=len(history), snapshots=history[DATE_COL].nunique())
+    with stage("save", output=output_path):
+        write_history(history, output_path)
+    return history
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the 'Toxic Remediation' history from dated Archer extracts.")
+    parser.add_argument("directory", help="folder of Archer extracts, each with its snapshot date in the file name")
+    parser.add_argument("--output", default=HISTORY_FILE, help=f"dataset to append to (.csv, .parquet or .xlsx; default {HISTORY_FILE!r})")
+    parser.add_argument("--sheet", default=ARCHER_SHEET, help=f"sheet of each extract (default {ARCHER_SHEET!r})")
+    parser.add_argument("--jobs", type=int, metavar="N", help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-rows", type=int, metavar="N", help="stream each extract N rows at a time")
+    add_profile_argument(parser)
+    args = parse_profiled_args(parser)
+    history = update_history(args.directory, args.output, args.sheet, args.jobs, args.chunk_rows)
+    print(f"{history[DATE_COL].nunique()} snapshot(s), {len(history)} rows written to {args.output}")
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from archer_data import ALL_OE_LIST, FLT_STATUS, GROUP_TYPE, LOCAL_TYPE, TOXIC_STATUS
+
+
+ARCHER_COLUMNS = [
+    "Allianz OE Name", "IT Component Name", "IT Component Type", "Release", "Toxic from Date",
+    "Current Status", "Number of IT Assets", "Planned Completion Date", "Action Plan",
+    "Information Risks ID", "Record Quality", "Record Quality Indicator", "Comments", "File",
+]
+
+
+def synthetic_oe_names(n_oes):
+    """The real OEs first, then made-up ones once there are more than nine."""
+    extra = [f"Allianz Synthetic OE {i:03d}" for i in range(max(0, n_oes - len(ALL_OE_LIST)))]
+    return (ALL_OE_LIST + extra)[:n_oes]
+
+
+def synthetic_archer_extract(n_rows, n_oes=len(ALL_OE_LIST), n_components=200, seed=0,
+                             snapshot_date="2025-07-08"):
+    """Random extract with the "Archer Search Report (2)" schema and parsed types.
+
+    `n_components` distinct (IT Component Name, Release, Toxic from Date)
+    triplets are spread over `n_rows` rows; names come in runs of a few
+    releases each, and ~5% of the triplets have no Toxic from Date, like the
+    real extract.
+    """
+    rng = np.random.default_rng(seed)
+
+    # === Component triplets ===
+    triplet = np.arange(n_components)
+    names = np.array([f"Synthetic Component {i // 3:04d}" for i in triplet], dtype=object)
+    releases = np.array([f"{1 + i % 3}.{i % 7}" for i in triplet], dtype=object)
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 5 * 365, n_components), unit="D")
+    dates = dates.where(rng.random(n_components) >= 0.05)
+    planned = np.asarray((dates - pd.Timedelta(days=1)).strftime("%m/%d/%Y"), dtype=object)
+
+    # === Rows ===
+    pick = rng.integers(0, n_components, n_rows)
+    df = pd.DataFrame({
+        "Allianz OE Name": np.array(synthetic_oe_names(n_oes), dtype=object)[rng.integers(0, n_oes, n_rows)],
+        "IT Component Name": names[pick],
+        "IT Component Type": rng.choice(np.array([GROUP_TYPE, LOCAL_TYPE], dtype=object), n_rows),
+        "Release": releases[pick],
+        "Toxic from Date": dates[pick],
+        "Current Status": rng.choice(np.array([FLT_STATUS, TOXIC_STATUS], dtype=object), n_rows),
+        "Number of IT Assets": rng.integers(1, 50, n_rows).astype(float),
+        "Planned Completion Date": planned[pick],
+        "Action Plan": rng.choice(np.array(["Y", "N"], dtype=object), n_rows),
+        "Information Risks ID": None,
+        "Record Quality": "Complete",
+        "Record Quality Indicator": None,
+        "Comments": None,
+        "File": pd.Timestamp(snapshot_date),
+    })
+    return df[ARCHER_COLUMNS]
+
+
+def write_synthetic_extract(df, file_path, sheet_name="Archer Search Report (2)"):
+    """Save a synthetic extract as an xlsx, laid out like the real Archer export."""
+    df.to_excel(file_path, sheet_name=sheet_name, index=False)
+    return file_path
@@ -0,0 +1,74 @@
+import pandas as pd
+
+from calendar_index import decom_index, toxic_index, window_bounds, window_table, window_values
+from decom_data import EXTRACT_DATE, FORECAST_END, OE_CODE, OE_NAME, PHASE
+from decom_metrics import COMPLETED, IN_PROGRESS, decom_counts, extract_window, window_count
+from pivot_engine import STATUS_COL, TYPE_COL, VALUE_COL
+from snapshot_history import DATE_COL
+
+
+def window_at(index, month, window="Year"):
+    return window_values(index, *window_bounds([pd.Period(month, "M")], window)).iloc[0]
+
+
+def toxic_history(*dated_values):
+    snapshot = pd.DataFrame({STATUS_COL: ["Toxic", "Forward Looking Toxic"], TYPE_COL: ["Group", "Group"]})
+    return pd.concat(
+        [snapshot.assign(**{DATE_COL: pd.Timestamp(date), VALUE_COL: values}) for date, values in dated_values],
+        ignore_index=True,
+    )
+
+
+def test_decom_year_window_is_one_extract():
+    # Three monthly extracts restating the same four apps
+    apps = pd.DataFrame({
+        OE_NAME: "Allianz Thailand",
+        OE_CODE: "TH",
+        FORECAST_END: pd.to_datetime(["2025-02-15", "2025-06-30", "2025-11-01", "2026-03-31"]),
+        PHASE: ["Completed", "Completed", "Not started", "Completed"],
+    })
+    decom = pd.concat(
+        [apps.assign(**{EXTRACT_DATE: pd.Timestamp(date)}) for date in ("2025-08-05", "2025-09-02", "2025-10-07")],
+        ignore_index=True,
+    )
+    counts = decom_counts(decom)
+    extract_month, _ = extract_window(counts, 2025)
+
+    totals = window_at(decom_index(decom, extract_month), "2025-04")
+
+    assert totals[COMPLETED] == window_count(counts, COMPLETED, 2025) == 2
+    assert totals[IN_PROGRESS] == window_count(counts, IN_PROGRESS, 2025) == 1
+
+
+def test_toxic_year_window_is_the_latest_snapshot():
+    history = toxic_history(("2025-07-08", [10.0, 4.0]), ("2025-08-05", [7.0, 5.0]))
+
+    totals = window_at(toxic_index(history), "2025-01")
+
+    assert totals[(VALUE_COL, "Toxic", "Group")] == 7
+    assert totals[(VALUE_COL, "Forward Looking Toxic", "Group")] == 5
+
+
+def test_snapshot_before_the_window_is_stale():
+    index = toxic_index(toxic_history(("2024-11-04", [10.0, 4.0]), ("2025-03-03", [7.0, 5.0])))
+
+    assert window_at(index, "2024-06")[(VALUE_COL, "Toxic", "Group")] == 10
+    assert (window_at(index, "2025-02", "Month") == 0).all()
+    assert (window_at(index, "2025-01", "Year to date") == 0).all()
+    assert (window_at(index, "2025-03", "Previous month") == 0).all()
+    assert window_at(index, "2025-04", "Year to date")[(VALUE_COL, "Toxic", "Group")] == 7
+
+
+def test_empty_sources_have_zero_windows():
+    history = toxic_history(("2025-01-06", [1.0, 1.0])).iloc[:0]
+    decom = pd.DataFrame({
+        EXTRACT_DATE: pd.to_datetime(["2025-08-05"]),
+        FORECAST_END: pd.to_datetime(["2025-06-30"]),
+        PHASE: ["Completed"],
+    })
+
+    # No history, no decom rows, and a decom extract month that was never taken
+    for index in (toxic_index(history), decom_index(decom.iloc[:0]), decom_index(decom, "2024-06")):
+        table = window_table(index, [pd.Period("2025-06", "M")])
+        assert len(table) == 5
+        assert (table.drop(columns=["Month", "Window"]) == 0).all().all()
@@ -0,0 +1,44 @@
+import pandas as pd
+
+from decom_data import DECOM_COLUMNS, EXTRACT_DATE, FORECAST_END, PHASE, normalise_decom
+from decom_metrics import COMPLETED, IN_PROGRESS, decom_counts, store_window_count, window_count
+from decom_store import read_partitions, write_partition
+
+
+def decom_rows():
+    # Three monthly extracts restating the same four apps, the last one with one more completed
+    apps = pd.DataFrame({
+        "Name": "Allianz Thailand (TH)",
+        FORECAST_END: ["2025-02-15", "2025-06-30", "2025-11-01", "2026-03-31"],
+        PHASE: ["Completed", "Completed", "Not started", "Completed"],
+    })
+    extracts = []
+    for date in ("2025-08-05", "2025-09-02", "2025-10-07"):
+        extract = apps.assign(**{EXTRACT_DATE: date})
+        if date == "2025-10-07":
+            extract.loc[2, PHASE] = "Completed"
+        extracts.append(extract)
+    return normalise_decom(pd.concat(extracts, ignore_index=True).reindex(columns=DECOM_COLUMNS))
+
+
+def test_empty_store_reads_as_typed_rows(tmp_path):
+    decom = read_partitions(store_dir=str(tmp_path / "store"))
+
+    assert decom.empty
+    assert decom[EXTRACT_DATE].dtype.kind == decom[FORECAST_END].dtype.kind == "M"
+    assert window_count(decom_counts(decom), COMPLETED, 2025) == 0
+    assert store_window_count(COMPLETED, 2025, store_dir=str(tmp_path / "store")) == 0
+
+
+def test_store_window_count_matches_the_full_counts(tmp_path):
+    store_dir = str(tmp_path / "store")
+    decom = decom_rows()
+    for month, rows in decom.groupby(decom[EXTRACT_DATE].dt.to_period("M")):
+        write_partition(rows, month, store_dir)
+    counts = decom_counts(decom)
+
+    for column in (COMPLETED, IN_PROGRESS):
+        for window in ({"year": 2025}, {}, {"year": 2025, "month": 9}, {"year": 2025, "month": 10, "previous_month": True}):
+            assert store_window_count(column, store_dir=store_dir, **window) == window_count(counts, column, **window)
+    assert store_window_count(COMPLETED, 2025, store_dir=store_dir) == 3
+    assert store_window_count(COMPLETED, 2025, 9, store_dir=store_dir) == 2
@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from archer_data import ARCHER_FILE
+from extract_cache import cached_frame
+from synthetic_archer import synthetic_archer_extract, write_synthetic_extract
+
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_reports(work_dir, profile_name):
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, REPORT_CACHE_DIR=os.path.join(work_dir, "cache"))
+    env.pop("REPORT_PROFILE", None)
+    subprocess.run(
+        [sys.executable, os.path.join(REPO_DIR, "run_all_reports.py"), "--profile", profile_name],
+        cwd=work_dir, env=env, check=True, capture_output=True,
+    )
+    with open(os.path.join(work_dir, profile_name), encoding="utf-8") as f:
+        return [entry["stage"] for entry in json.load(f)["stages"]]
+
+
+def test_second_report_run_hits_the_extract_cache(tmp_path):
+    # The reports are saved back into the extract, which must not invalidate its parsed copy
+    write_synthetic_extract(synthetic_archer_extract(2_000, seed=1), str(tmp_path / ARCHER_FILE))
+
+    first = run_reports(str(tmp_path), "first.json")
+    second = run_reports(str(tmp_path), "second.json")
+
+    assert any(stage.endswith("/read_excel") for stage in first)
+    assert not any(stage.endswith("/read_excel") for stage in second)
+
+
+def test_new_variant_version_prunes_the_old_one(tmp_path):
+    extract = str(tmp_path / "extract.xlsx")
+    pd.DataFrame({"a": [1, 2]}).to_excel(extract, sheet_name="Data", index=False)
+    cache_dir = str(tmp_path / "cache")
+
+    for variant in ("v1", "cells-v1", "v2"):
+        cached_frame(extract, "Data", lambda: pd.DataFrame({"a": [1, 2]}), variant=variant, cache_dir=cache_dir)
+
+    variants = sorted(name.split("-")[2] for name in os.listdir(cache_dir))
+    assert variants == ["cells_v1", "v2"]
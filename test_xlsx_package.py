@@ -0,0 +1,95 @@
+import io
+import zipfile
+
+from openpyxl import load_workbook
+
+from archer_data import ARCHER_SHEET, compact_archer_frame
+from flt_pvt import generate_flt_pvt_sheet
+from Group_FLT_Details import generate_group_flt_details
+from pivot_engine import build_cube
+from report_workbook import new_report_workbook
+from synthetic_archer import synthetic_archer_extract, write_synthetic_extract
+from xlsx_package import combine_packages, render_package, splice_packages
+
+
+# Parts splice_packages may rewrite; everything else must be copied byte for byte
+REWRITTEN_PARTS = {"[Content_Types].xml", "xl/workbook.xml", "xl/_rels/workbook.xml.rels", "xl/styles.xml"}
+
+
+def rendered_reports():
+    cube = build_cube(compact_archer_frame(synthetic_archer_extract(500, seed=2)))
+    reports = []
+    for generate in (generate_flt_pvt_sheet, generate_group_flt_details):
+        wb = new_report_workbook()
+        generate(wb, cube)
+        reports.append(render_package(wb))
+    return reports
+
+
+def sheet_cells(ws):
+    """{coordinate: (value, named style, bold, fill colour)} of every non-empty or styled cell."""
+    return {
+        cell.coordinate: (cell.value, cell.style, cell.font.b, cell.fill.fgColor.rgb if cell.fill.fill_type else None)
+        for row in ws.iter_rows() for cell in row
+        if cell.value is not None or cell.has_style
+    }
+
+
+def expected_sheets(reports):
+    sheets = {}
+    for report in reports:
+        wb = load_workbook(io.BytesIO(report))
+        sheets.update({ws.title: sheet_cells(ws) for ws in wb.worksheets})
+    return sheets
+
+
+def zip_parts(path):
+    with zipfile.ZipFile(path) as package:
+        return {name: package.read(name) for name in package.namelist()}
+
+
+def test_splice_keeps_report_values_styles_and_source_parts(tmp_path):
+    base = write_synthetic_extract(synthetic_archer_extract(200, seed=3), str(tmp_path / "extract.xlsx"))
+    output = str(tmp_path / "spliced.xlsx")
+    reports = rendered_reports()
+
+    splice_packages(base, reports, output)
+
+    wb = load_workbook(output)
+    expected = expected_sheets(reports)
+    assert wb.sheetnames == [ARCHER_SHEET] + list(expected)
+    for title, cells in expected.items():
+        assert sheet_cells(wb[title]) == cells
+    report_styles = {name for report in reports for name in load_workbook(io.BytesIO(report)).style_names}
+    assert report_styles <= set(wb.style_names)
+
+    before, after = zip_parts(base), zip_parts(output)
+    for name, data in before.items():
+        if name not in REWRITTEN_PARTS:
+            assert after[name] == data, name
+
+
+def test_splicing_again_replaces_the_sheets_in_place(tmp_path):
+    base = write_synthetic_extract(synthetic_archer_extract(200, seed=3), str(tmp_path / "extract.xlsx"))
+    reports = rendered_reports()
+
+    splice_packages(base, reports)
+    once = zip_parts(base)
+    splice_packages(base, reports)
+
+    wb = load_workbook(base)
+    assert wb.sheetnames == [ARCHER_SHEET] + list(expected_sheets(reports))
+    assert zip_parts(base) == once
+
+
+def test_combine_packages_holds_every_report_in_order(tmp_path):
+    output = str(tmp_path / "reports.xlsx")
+    reports = rendered_reports()
+
+    combine_packages(reports, output)
+
+    wb = load_workbook(output)
+    expected = expected_sheets(reports)
+    assert wb.sheetnames == list(expected)
+    for title, cells in expected.items():
+        assert sheet_cells(wb[title]) == cells
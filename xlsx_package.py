@@ -0,0 +1,482 @@
+import io
+import os
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+DOC_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+WORKSHEET_REL = DOC_REL_NS + "/worksheet"
+CALC_CHAIN_REL = DOC_REL_NS + "/calcChain"
+STYLES_REL = DOC_REL_NS + "/styles"
+SHARED_STRINGS_REL = DOC_REL_NS + "/sharedStrings"
+OFFICE_DOCUMENT_REL = DOC_REL_NS + "/officeDocument"
+WORKSHEET_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+# Prefixes used when writing report XML; the spreadsheet namespace is the default one
+PREFIXES = {MAIN_NS: "", DOC_REL_NS: "r", XML_NS: "xml"}
+
+CONTENT_TYPES_PART = "[Content_Types].xml"
+
+# Children of <styleSheet>, in the order the schema requires them
+STYLE_SECTIONS = [
+    "numFmts", "fonts", "fills", "borders", "cellStyleXfs", "cellXfs", "cellStyles",
+    "dxfs", "tableStyles", "colors", "extLst",
+]
+FIRST_CUSTOM_NUMFMT = 164
+
+
+def _q(tag, ns=MAIN_NS):
+    return f"{{{ns}}}{tag}"
+
+
+def _canonical(element):
+    return ET.canonicalize(ET.tostring(element, encoding="unicode"))
+
+
+def _declares_main_ns(text):
+    """Whether the document element of `text` declares the spreadsheet namespace as default."""
+    root = re.search(r"<(?![?!])[^>]*>", text).group(0)
+    return f'xmlns="{MAIN_NS}"' in root
+
+
+def _name(qname):
+    if not qname.startswith("{"):
+        return qname
+    ns, local = qname[1:].split("}")
+    prefix = PREFIXES[ns]
+    return f"{prefix}:{local}" if prefix else local
+
+
+def serialize(element, namespaces=()):
+    """XML text of `element` with the fixed PREFIXES; declares `namespaces` on the root."""
+    out = []
+
+    def write(element, declarations=""):
+        attrs = "".join(f" {_name(key)}={quoteattr(value)}" for key, value in element.attrib.items())
+        out.append(f"<{_name(element.tag)}{declarations}{attrs}")
+        if element.text is None and not len(element):
+            out.append("/>")
+        else:
+            out.append(">")
+            if element.text is not None:
+                out.append(escape(element.text))
+            for child in element:
+                write(child)
+                if child.tail is not None:
+                    out.append(escape(child.tail))
+            out.append(f"</{_name(element.tag)}>")
+
+    declarations = "".join(
+        f' xmlns="{ns}"' if not PREFIXES[ns] else f' xmlns:{PREFIXES[ns]}="{ns}"'
+        for ns in namespaces
+    )
+    write(element, declarations)
+    return "".join(out)
+
+
+def _snippet(element, text):
+    """Serialise `element` for insertion into `text`, declaring the namespace only if needed."""
+    return serialize(element, () if _declares_main_ns(text) else (MAIN_NS,))
+
+
+# === Package helpers ===
+
+def _rels_path(part):
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", name + ".rels")
+
+
+def _resolve(source_part, target):
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+
+def _relationships(xml):
+    """[(Id, Type, Target, TargetMode)] of a .rels part."""
+    root = ET.fromstring(xml)
+    return [
+        (rel.get("Id"), rel.get("Type"), rel.get("Target"), rel.get("TargetMode"))
+        for rel in root.iter(_q("Relationship", PKG_REL_NS))
+    ]
+
+
+def _workbook_part(parts):
+    for _, rel_type, target, _ in _relationships(parts["_rels/.rels"]):
+        if rel_type == OFFICE_DOCUMENT_REL:
+            return _resolve("", target)
+    raise ValueError("xlsx package has no workbook part")
+
+
+def _sheet_parts(parts, workbook_part):
+    """[(name, part)] of the package's worksheets, in workbook order."""
+    targets = {
+        rel_id: _resolve(workbook_part, target)
+        for rel_id, _, target, _ in _relationships(parts[_rels_path(workbook_part)])
+    }
+    workbook = ET.fromstring(parts[workbook_part])
+    return [
+        (sheet.get("name"), targets[sheet.get(_q("id", DOC_REL_NS))])
+        for sheet in workbook.iter(_q("sheet"))
+    ]
+
+
+def sheet_source_parts(package, sheet_name):
+    """Part names one worksheet's values are read from: its XML, then sharedStrings/styles if present.
+
+    `sheet_name` may also be a sheet position, as for pd.read_excel. None if
+    the workbook has no such sheet.
+    """
+    names = set(package.namelist())
+    workbook_part = _workbook_part({"_rels/.rels": package.read("_rels/.rels")})
+    parts = {part: package.read(part) for part in (workbook_part, _rels_path(workbook_part))}
+    sheets = _sheet_parts(parts, workbook_part)
+    if isinstance(sheet_name, int):
+        found = [sheets[sheet_name][1]] if -len(sheets) <= sheet_name < len(sheets) else []
+    else:
+        found = [part for name, part in sheets if name == sheet_name]
+    if not found:
+        return None
+    shared = [
+        _resolve(workbook_part, target)
+        for _, rel_type, target, _ in _relationships(parts[_rels_path(workbook_part)])
+        if rel_type in (SHARED_STRINGS_REL, STYLES_REL)
+    ]
+    return found[:1] + sorted(part for part in shared if part in names)
+
+
+def _insert_before_close(text, tag, snippet):
+    match = re.search(rf"</(?:\w+:)?{tag}>", text)
+    if match is None:
+        raise ValueError(f"no </{tag}> in package part")
+    return text[:match.start()] + snippet + text[match.start():]
+
+
+# === Styles ===
+
+def _set_count(text, tag, count):
+    def repl(match):
+        opening = match.group(0)
+        if re.search(r'\scount="\d+"', opening):
+            return re.sub(r'\scount="\d+"', f' count="{count}"', opening, count=1)
+        return opening.replace(match.group(1), f'{match.group(1)} count="{count}"', 1)
+
+    return re.sub(rf"(<(?:\w+:)?{tag})\b[^>]*>", repl, text, count=1)
+
+
+def _append_to_section(text, tag, snippets, count):
+    """Add child `snippets` to styles section `tag`, creating the section if needed."""
+    if not snippets:
+        return text
+    body = "".join(snippets)
+    self_closing = re.search(rf"<((?:\w+:)?{tag})\b([^>]*)/>", text)
+    if self_closing:
+        text = text.replace(self_closing.group(0), f"<{self_closing.group(1)}{self_closing.group(2)}></{self_closing.group(1)}>", 1)
+    if re.search(rf"<(?:\w+:)?{tag}\b", text):
+        text = _insert_before_close(text, tag, body)
+        return _set_count(text, tag, count)
+
+    section = f'<{tag} count="{count}">{body}</{tag}>'
+    for later in STYLE_SECTIONS[STYLE_SECTIONS.index(tag) + 1:]:
+        match = re.search(rf"<(?:\w+:)?{later}\b", text)
+        if match:
+            return text[:match.start()] + section + text[match.start():]
+    return _insert_before_close(text, "styleSheet", section)
+
+
+def _children(root, tag):
+    section = root.find(_q(tag))
+    return [] if section is None else list(section)
+
+
+def merge_styles(styles_xml, report_styles_xml):
+    """Add the report's styles to the package's styles.xml.
+
+    Fonts, fills, borders, number formats and cell formats the package
+    already has are reused, named styles are matched by name, everything else
+    is appended. Returns the new styles.xml text and the report cellXfs index
+    -> package cellXfs index map used to restyle the report's cells.
+    """
+    text = styles_xml.decode("utf-8") if isinstance(styles_xml, bytes) else styles_xml
+    source = ET.fromstring(styles_xml)
+    report = ET.fromstring(report_styles_xml)
+
+    # === Number formats: keep builtins, reuse identical codes, number new ones ===
+    source_fmts = {fmt.get("formatCode"): int(fmt.get("numFmtId")) for fmt in _children(source, "numFmts")}
+    next_fmt = max(source_fmts.values(), default=FIRST_CUSTOM_NUMFMT - 1) + 1
+    fmt_map, new_fmts = {}, []
+    for fmt in _children(report, "numFmts"):
+        code, fmt_id = fmt.get("formatCode"), int(fmt.get("numFmtId"))
+        if code not in source_fmts:
+            source_fmts[code] = next_fmt
+            new_fmts.append(_snippet(ET.Element(_q("numFmt"), numFmtId=str(next_fmt), formatCode=code), text))
+            next_fmt += 1
+        fmt_map[fmt_id] = source_fmts[code]
+    text = _append_to_section(text, "numFmts", new_fmts, len(source_fmts))
+
+    # === Fonts, fills, borders: reuse identical elements ===
+    maps = {}
+    for tag in ("fonts", "fills", "borders"):
+        existing = _children(source, tag)
+        index = {}
+        for i, element in enumerate(existing):
+            index.setdefault(_canonical(element), i)
+        maps[tag], snippets = [], []
+        for element in _children(report, tag):
+            key = _canonical(element)
+            if key not in index:
+                index[key] = len(existing) + len(snippets)
+                snippets.append(_snippet(element, text))
+            maps[tag].append(index[key])
+        text = _append_to_section(text, tag, snippets, len(existing) + len(snippets))
+
+    def remap_xf(xf, style_xf_map=None):
+        xf = ET.fromstring(ET.tostring(xf))
+        for attr, mapping in (("fontId", maps["fonts"]), ("fillId", maps["fills"]), ("borderId", maps["borders"])):
+            if xf.get(attr) is not None:
+                xf.set(attr, str(mapping[int(xf.get(attr))]))
+        if xf.get("numFmtId") is not None:
+            fmt_id = int(xf.get("numFmtId"))
+            xf.set("numFmtId", str(fmt_map.get(fmt_id, fmt_id)))
+        if style_xf_map is not None and xf.get("xfId") is not None:
+            xf.set("xfId", str(style_xf_map[int(xf.get("xfId"))]))
+        return xf
+
+    # === Named styles: match by name, append the report's own ===
+    source_named = {style.get("name"): int(style.get("xfId")) for style in _children(source, "cellStyles")}
+    report_named = {int(style.get("xfId")): style for style in _children(report, "cellStyles")}
+    style_xfs = _children(source, "cellStyleXfs")
+    style_xf_map, new_style_xfs, new_named = [], [], []
+    for i, xf in enumerate(_children(report, "cellStyleXfs")):
+        named = report_named.get(i)
+        if named is not None and named.get("name") in source_named:
+            style_xf_map.append(source_named[named.get("name")])
+            continue
+        new_index = len(style_xfs) + len(new_style_xfs)
+        style_xf_map.append(new_index)
+        new_style_xfs.append(_snippet(remap_xf(xf), text))
+        if named is not None:
+            named = ET.fromstring(ET.tostring(named))
+            named.set("xfId", str(new_index))
+            new_named.append(_snippet(named, text))
+            source_named[named.get("name")] = new_index
+    text = _append_to_section(text, "cellStyleXfs", new_style_xfs, len(style_xfs) + len(new_style_xfs))
+
+    # === Cell formats: reuse identical ones ===
+    cell_xfs = _children(source, "cellXfs")
+    index = {}
+    for i, xf in enumerate(cell_xfs):
+        index.setdefault(_canonical(xf), i)
+    xf_map, new_cell_xfs = [], []
+    for xf in _children(report, "cellXfs"):
+        xf = remap_xf(xf, style_xf_map)
+        key = _canonical(xf)
+        if key not in index:
+            index[key] = len(cell_xfs) + len(new_cell_xfs)
+            new_cell_xfs.append(_snippet(xf, text))
+        xf_map.append(index[key])
+    text = _append_to_section(text, "cellXfs", new_cell_xfs, len(cell_xfs) + len(new_cell_xfs))
+    text = _append_to_section(text, "cellStyles", new_named, len(source_named))
+    return text.encode("utf-8"), xf_map
+
+
+# === Report sheets ===
+
+def _shared_strings(parts):
+    xml = parts.get("xl/sharedStrings.xml")
+    if xml is None:
+        return []
+    return ["".join(si.itertext()) for si in ET.fromstring(xml).iter(_q("si"))]
+
+
+def restyle_sheet(sheet_xml, xf_map, shared_strings):
+    """Report worksheet XML ready to live in another package.
+
+    Style indexes are mapped onto the package's styles.xml and shared strings
+    become inline strings, so the package's sharedStrings.xml stays untouched.
+    """
+    root = ET.fromstring(sheet_xml)
+    for view in root.iter(_q("sheetView")):
+        view.attrib.pop("tabSelected", None)
+    for tag in ("c", "row"):
+        for element in root.iter(_q(tag)):
+            if element.get("s") is not None:
+                element.set("s", str(xf_map[int(element.get("s"))]))
+    for col in root.iter(_q("col")):
+        if col.get("style") is not None:
+            col.set("style", str(xf_map[int(col.get("style"))]))
+
+    for cell in root.iter(_q("c")):
+        if cell.get("t") != "s":
+            continue
+        value = cell.find(_q("v"))
+        string = shared_strings[int(value.text)]
+        cell.remove(value)
+        cell.set("t", "inlineStr")
+        inline = ET.SubElement(cell, _q("is"))
+        t = ET.SubElement(inline, _q("t"))
+        t.text = string
+        if string != string.strip():
+            t.set(f"{{{XML_NS}}}space", "preserve")
+    xml = serialize(root, (MAIN_NS, DOC_REL_NS))
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n' + xml).encode("utf-8")
+
+
+def render_package(report_wb):
+    """The saved xlsx bytes of `report_wb` (picklable, e.g. a worker process's sheet)."""
+    buffer = io.BytesIO()
+    report_wb.save(buffer)
+    return buffer.getvalue()
+
+
+def _package_parts(xlsx):
+    with zipfile.ZipFile(io.BytesIO(xlsx)) as package:
+        return {name: package.read(name) for name in package.namelist()}
+
+
+def _styles_part(parts, workbook_part):
+    for _, rel_type, target, _ in _relationships(parts[_rels_path(workbook_part)]):
+        if rel_type == STYLES_REL:
+            return _resolve(workbook_part, target)
+    raise ValueError("xlsx package has no styles part")
+
+
+def splice_report_sheets(package_path, report_wb, output_path=None):
+    """Put the sheets of `report_wb` into the xlsx at `package_path` (see splice_packages)."""
+    return splice_packages(package_path, [render_package(report_wb)], output_path)
+
+
+def combine_packages(reports, output_path):
+    """One xlsx holding the sheets of all rendered `reports`, in order."""
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(reports[0])
+    os.replace(tmp_path, output_path)
+    return splice_packages(output_path, reports[1:])
+
+
+def splice_packages(package_path, reports, output_path=None):
+    """Put the sheets of the rendered xlsx `reports` into the xlsx at `package_path`.
+
+    A sheet whose name matches an existing one (case-insensitively) replaces
+    it in place; other sheets are added at the end. Only the report sheets,
+    styles.xml, workbook.xml, its relationships and [Content_Types].xml are
+    rewritten - every other part, source sheets included, is copied over
+    unchanged, so the cost follows the size of the reports rather than of the
+    workbook. Writes to `output_path` (default: `package_path`) atomically.
+    """
+    output_path = output_path or package_path
+
+    with zipfile.ZipFile(package_path) as package:
+        infos = package.infolist()
+        names = [info.filename for info in infos]
+        workbook_part = _workbook_part({"_rels/.rels": package.read("_rels/.rels")})
+        workbook_rels_part = _rels_path(workbook_part)
+        to_read = [CONTENT_TYPES_PART, workbook_part, workbook_rels_part]
+        parts = {name: package.read(name) for name in to_read}
+        existing = _sheet_parts(parts, workbook_part)
+        styles_part = _styles_part(parts, workbook_part)
+        styles_xml = package.read(styles_part)
+
+        content_types = parts[CONTENT_TYPES_PART].decode("utf-8")
+        workbook = parts[workbook_part].decode("utf-8")
+        workbook_rels = parts[workbook_rels_part].decode("utf-8")
+        rel_prefix = re.search(rf'xmlns:(\w+)="{re.escape(DOC_REL_NS)}"', workbook).group(1)
+
+        replaced = {}   # part name -> new XML
+        dropped = set()
+        existing_by_name = {name.lower(): (name, part) for name, part in existing}
+        rel_ids = {rel_id for rel_id, _, _, _ in _relationships(parts[workbook_rels_part])}
+        sheet_ids = [int(m) for m in re.findall(r'<(?:\w+:)?sheet\b[^>]*\bsheetId="(\d+)"', workbook)]
+
+        for report_xlsx in reports:
+            report = _package_parts(report_xlsx)
+            report_workbook = _workbook_part(report)
+            styles_xml, xf_map = merge_styles(styles_xml, report[_styles_part(report, report_workbook)])
+            shared_strings = _shared_strings(report)
+            for title, report_part in _sheet_parts(report, report_workbook):
+                sheet_xml = restyle_sheet(report[report_part], xf_map, shared_strings)
+                match = existing_by_name.get(title.lower())
+                if match is not None:
+                    # === Replace in place: same part, same position; drop what hung off the old sheet ===
+                    old_title, part = match
+                    replaced[part] = sheet_xml
+                    old_rels = _rels_path(part)
+                    if old_rels in names:
+                        dropped.add(old_rels)
+                        for _, _, target, mode in _relationships(package.read(old_rels)):
+                            if mode != "External":
+                                target_part = _resolve(part, target)
+                                dropped.update({target_part, _rels_path(target_part)})
+                    if old_title != title:
+                        workbook = workbook.replace(f"name={quoteattr(old_title)}", f"name={quoteattr(title)}", 1)
+                    continue
+
+                # === Add at the end: new part, relationship, <sheet> entry, content type ===
+                number = 1
+                while f"xl/worksheets/sheet{number}.xml" in names or f"xl/worksheets/sheet{number}.xml" in replaced:
+                    number += 1
+                part = f"xl/worksheets/sheet{number}.xml"
+                replaced[part] = sheet_xml
+                rel_number = 1
+                while f"rId{rel_number}" in rel_ids:
+                    rel_number += 1
+                rel_id = f"rId{rel_number}"
+                rel_ids.add(rel_id)
+                sheet_id = max(sheet_ids, default=0) + 1
+                sheet_ids.append(sheet_id)
+                target = posixpath.relpath(part, posixpath.dirname(workbook_part))
+
+                workbook_rels = _insert_before_close(
+                    workbook_rels, "Relationships",
+                    f'<Relationship Id="{rel_id}" Type="{WORKSHEET_REL}" Target="{target}"/>',
+                )
+                workbook = _insert_before_close(
+                    workbook, "sheets",
+                    f'<sheet name={quoteattr(title)} sheetId="{sheet_id}" {rel_prefix}:id="{rel_id}"/>',
+                )
+                content_types = _insert_before_close(
+                    content_types, "Types",
+                    f'<Override PartName="/{part}" ContentType="{WORKSHEET_CONTENT_TYPE}"/>',
+                )
+                existing_by_name[title.lower()] = (title, part)
+
+        if any(part in names for part in replaced):
+            # Formula cells of a replaced sheet are gone; Excel rebuilds the calc chain
+            for rel_id, rel_type, target, _ in _relationships(parts[workbook_rels_part]):
+                if rel_type == CALC_CHAIN_REL:
+                    dropped.add(_resolve(workbook_part, target))
+                    workbook_rels = re.sub(rf'<Relationship\b[^>]*\bId="{rel_id}"[^>]*/>', "", workbook_rels)
+        for part in dropped:
+            content_types = re.sub(rf'<Override\b[^>]*\bPartName="/{re.escape(part)}"[^>]*/>', "", content_types)
+
+        rewritten = {
+            CONTENT_TYPES_PART: content_types.encode("utf-8"),
+            workbook_part: workbook.encode("utf-8"),
+            workbook_rels_part: workbook_rels.encode("utf-8"),
+            styles_part: styles_xml,
+            **replaced,
+        }
+
+        tmp_path = output_path + ".tmp"
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as out:
+            for info in infos:
+                if info.filename in dropped:
+                    continue
+                data = rewritten.pop(info.filename, None)
+                if data is None:
+                    # Untouched part: same bytes, same entry settings
+                    data = package.read(info)
+                out.writestr(info, data)
+            for part, data in rewritten.items():
+                out.writestr(part, data)
+    os.replace(tmp_path, output_path)
+    return output_path